@@ -2,7 +2,7 @@ from dataclasses import dataclass, replace
 from functools import cached_property
 from typing import Any, Dict, Tuple
 
-from pytris.tetromino import ROTATIONS, Tetromino
+from pytris.tetromino import ROTATIONS, SHAPES, Shape, Tetromino
 
 general_rotation_offsets = {
     (0, 1): ((0, 0), (-1, 0), (-1, 1), (0, -2), (-1, -2)),
@@ -34,6 +34,11 @@ ROTATION_OFFSETS = {
         (0, 3): ((0, 0), (-1, 0), (2, 0), (-1, 2), (2, -1)),
     }
 }
+# the kicks to try for every rotation index, flattened out of ROTATION_OFFSETS once at import
+RIGHT_KICKS = {name: tuple(ROTATION_OFFSETS[name][index, (index + 1) % len(rotations)] for index in range(len(rotations)))
+               for name, rotations in ROTATIONS.items()}
+LEFT_KICKS = {name: tuple(ROTATION_OFFSETS[name][index, (index - 1) % len(rotations)] for index in range(len(rotations)))
+              for name, rotations in ROTATIONS.items()}
 
 
 @dataclass
@@ -53,21 +58,29 @@ class ActiveTetromino(Tetromino):
     def right_rotation(self) -> Tuple[Tuple[int, int], ...]:
         return ROTATIONS[self.name][self.right_rotation_index]
 
+    @property
+    def right_shape(self) -> Shape:
+        return SHAPES[self.name][self.right_rotation_index]
+
     @property
     def left_rotation_index(self) -> int:
-        return (self.rotation_index + 1) % self.num_of_rotations
+        return (self.rotation_index - 1) % self.num_of_rotations
 
     @property
     def left_rotation(self) -> Tuple[Tuple[int, int], ...]:
         return ROTATIONS[self.name][self.left_rotation_index]
 
+    @property
+    def left_shape(self) -> Shape:
+        return SHAPES[self.name][self.left_rotation_index]
+
     @property
     def right_rotation_offsets(self) -> Tuple[Tuple[int, int], ...]:
-        return ROTATION_OFFSETS[self.name][self.rotation_index, self.right_rotation_index]
+        return RIGHT_KICKS[self.name][self.rotation_index]
 
     @property
     def left_rotation_offsets(self) -> Tuple[Tuple[int, int], ...]:
-        return ROTATION_OFFSETS[self.name][self.rotation_index, self.left_rotation_index]
+        return LEFT_KICKS[self.name][self.rotation_index]
 
     @property
     def visible_rotation(self) -> Tuple[Tuple[int, int], ...]:
@@ -1,116 +1,189 @@
+from collections import deque
 from dataclasses import dataclass
+from functools import lru_cache
 from math import inf
-from typing import Generator, Tuple
+from typing import FrozenSet, Generator, Iterator, Optional, Tuple
+
+import numpy as np
 
 from pytris import Tetris
-from pytris.active_tetromino import ActiveTetromino
+from pytris.active_tetromino import LEFT_KICKS, RIGHT_KICKS, ActiveTetromino
+from pytris.ai.cache import EvaluationCache
+from pytris.ai.evaluator import evaluate_moves, get_features, score_boards
 from pytris.ai.network import Network
-from pytris.board import Board
+from pytris.bitboard import BitBoard
+from pytris.engine import Engine
+from pytris.game_state import GameState
+from pytris.tetris import HARD_DROP_SCORE
+from pytris.tetromino import SHAPES
+from pytris.vector_engine import VectorEngine
 
 
 @dataclass(frozen=True)
 class Move:
+    """ A resting position of a tetromino, reached by moving, rotating and dropping it from where it spawned. """
     rotation: int = 0
-    right: int = 0
-    left: int = 0
-
-
-def get_right(tetromino, rotation) -> int:
-    """ Returns the amount of blocks the tetromino can move right. """
-    return 10 - (tetromino.x + max(i for i, j in tetromino.rotations[rotation]))
-
-
-def get_left(tetromino, rotation) -> int:
-    """ Returns the amount of blocks the tetromino can move left. """
-    return tetromino.x + min(i for i, j in tetromino.rotations[rotation]) + 1
+    x: int = 0
+    y: int = 0
+
+
+State = Tuple[int, int, int]
+# the lowest block of a rotation is at most 3 rows below its origin, and a kick moves it by at most 2 rows
+SURFACE_MARGIN = 3 + 2
+
+
+@lru_cache(maxsize=None)
+def get_free_positions(name: str, rotation_index: int, x: int, width: int) -> FrozenSet[Tuple[int, int]]:
+    """ Returns every (rotation, x) the tetromino can reach from (rotation_index, x) with nothing but walls around it. """
+    shapes = SHAPES[name]
+
+    def in_bounds(position: Tuple[int, int]) -> bool:
+        return 0 <= position[1] + shapes[position[0]].left and position[1] + shapes[position[0]].right < width
+
+    positions = {(rotation_index, x)}
+    queue = deque(positions)
+    while queue:
+        rotation, x = queue.popleft()
+        neighbours = [(rotation, x - 1), (rotation, x + 1)]
+        for kicks, target in ((RIGHT_KICKS[name][rotation], (rotation + 1) % len(shapes)),
+                              (LEFT_KICKS[name][rotation], (rotation - 1) % len(shapes))):
+            neighbours.extend((target, x + x_offset) for x_offset, _ in kicks[:1] if in_bounds((target, x + x_offset)))
+
+        for neighbour in neighbours:
+            if neighbour not in positions and in_bounds(neighbour):
+                positions.add(neighbour)
+                queue.append(neighbour)
+    return frozenset(positions)
+
+
+def get_start_states(board: BitBoard, tetromino: ActiveTetromino) -> Iterator[State]:
+    """
+    Returns the states the search starts from. When the tetromino spawns well above the stack, every position it can
+    reach in open air is reachable all the way down, so the search starts from all of them just above the stack
+    instead of walking every row of empty space.
+    """
+    surface = board.surface
+    shapes = SHAPES[tetromino.name]
+    if tetromino.y + max(shape.bottom for shape in shapes) + SURFACE_MARGIN >= surface - SURFACE_MARGIN:
+        yield tetromino.rotation_index, tetromino.x, tetromino.y
+        return
+
+    for rotation, x in get_free_positions(tetromino.name, tetromino.rotation_index, tetromino.x, board.width):
+        lowest = surface - 1 - shapes[rotation].bottom
+        for y in range(lowest - SURFACE_MARGIN, lowest + 1):
+            yield rotation, x, y
+
+
+def get_moves(board: BitBoard, tetromino: ActiveTetromino) -> Generator[Move, None, None]:
+    """
+    Searches every (rotation, x, y) state the tetromino can reach by moving, rotating and soft dropping, including
+    tucks and spins, and yields every distinct resting position exactly once.
+    """
+    shapes = SHAPES[tetromino.name]
+    right_kicks = RIGHT_KICKS[tetromino.name]
+    left_kicks = LEFT_KICKS[tetromino.name]
+    states = {state for state in get_start_states(board, tetromino) if board.fits(shapes[state[0]], state[1], state[2])}
+    queue = deque(states)
+    footprints = set()
+    while queue:
+        rotation, x, y = queue.popleft()
+        shape = shapes[rotation]
+        neighbours = [(rotation, x + x_offset, y) for x_offset in (-1, 1) if board.fits(shape, x + x_offset, y)]
+        for kicks, target in ((right_kicks[rotation], (rotation + 1) % len(shapes)),
+                              (left_kicks[rotation], (rotation - 1) % len(shapes))):
+            for x_offset, y_offset in kicks:
+                if board.fits(shapes[target], x + x_offset, y + y_offset):
+                    neighbours.append((target, x + x_offset, y + y_offset))
+                    break
+
+        if board.fits(shape, x, y + 1):
+            neighbours.append((rotation, x, y + 1))
+        else:
+            # symmetric rotations of I, S and Z can rest on the same blocks, only the first of them is yielded
+            footprint = tuple((y + j, mask << x if x >= 0 else mask >> -x) for j, mask in shape.row_masks)
+            if footprint not in footprints:
+                footprints.add(footprint)
+                yield Move(rotation, x, y)
+
+        for neighbour in neighbours:
+            if neighbour not in states:
+                states.add(neighbour)
+                queue.append(neighbour)
+
+
+def apply_move(tetris: Tetris, move: Move) -> None:
+    """ Lands the current tetromino of the game directly on the move's resting position and locks it. """
+    tetromino = tetris.current_tetromino
+    tetris.score += HARD_DROP_SCORE * max(move.y - tetromino.y, 0)
+    tetromino.rotation_index = move.rotation
+    tetromino.x = move.x
+    tetromino.y = move.y
+    tetris.lock()
 
 
-def get_moves(tetromino: ActiveTetromino) -> Generator[Move, None, None]:
-    """ Generates all possibl moves for the tetromino. """
-    for rotation in range(tetromino.num_of_rotations):
-        yield Move(rotation)
-        for right in range(1, get_right(tetromino, rotation)):
-            yield Move(rotation, right=right)
-        for left in range(1, get_left(tetromino, rotation)):
-            yield Move(rotation, left=left)
+def score_board(board: BitBoard, network: Network) -> float:
+    boards = np.array((board.rows,), dtype=np.int64)
+    return float(score_boards(boards, board.width, network)[0])
 
 
-def do_move(tetris: Tetris, move: Move) -> None:
-    for _ in range(move.rotation):
-        tetris.rotate_right()
+def _best_move(state: GameState, network: Network, cache: Optional[EvaluationCache] = None) -> Tuple[Move, float]:
+    """ Finds the best move according to the current tetromino, scoring all of its moves in one batch. """
+    moves = list(get_moves(state.board, state.active_tetromino))
+    if not moves:
+        return None, -inf
 
-    for _ in range(move.right):
-        tetris.move_right()
+    scores = evaluate_moves(state.board, state.current_tetromino, moves, network, cache)
+    best = int(scores.argmax())
+    return moves[best], float(scores[best])
 
-    for _ in range(move.left):
-        tetris.move_left()
 
-    tetris.hard_drop()
+def generate_best_move(tetris: Tetris, network: Network, cache: Optional[EvaluationCache] = None) -> Tuple[Move, bool]:
+    """ Returns the best move according to the current and held/next tetromino, without changing the game. """
+    return generate_best_state_move(GameState.from_tetris(tetris), network, cache)
 
-    tetromino = tetris.current_tetromino
-    for i, j in tetromino.rotation:
-        if tetromino.y + j >= 0:
-            tetris.board[tetromino.y + j][tetromino.x + i] = tetromino.name
 
+def generate_best_state_move(state: GameState, network: Network,
+                             cache: Optional[EvaluationCache] = None) -> Tuple[Move, bool]:
+    """ Returns the best move according to the current and held/next tetromino of the state. """
+    best_move, best_score = _best_move(state, network, cache)
+    held_state = state.hold()
+    if held_state is None:
+        return best_move, False
 
-def score_board(board: Board, network: Network) -> float:
-    aggregate_height = 0
-    bumpiness = 0
-    holes = 0
-    prev_col_height = None
-    for col in zip(*board):
-        col_height = 0
-        for i, cell in enumerate(col):
-            if col_height == 0 and cell is not None:
-                col_height = board.height - i
-
-            if i > 0 and col[i - 1] is not None and cell is None:
-                holes += 1
+    alt_best_move, alt_best_score = _best_move(held_state, network, cache)
+    use_alt_move = best_score < alt_best_score
+    return alt_best_move if use_alt_move else best_move, use_alt_move
 
-        aggregate_height += col_height
-        if prev_col_height is not None:
-            bumpiness += abs(col_height - prev_col_height)
 
-        prev_col_height = col_height
+def _best_placement(engine: Engine, name: str, network: Network) -> Tuple[Move, float]:
+    """ Finds the best placement of the tetromino in the engine, scoring all of them in one batch. """
+    moves = [Move(rotation, x, engine.landing_y(rotation, x, name)) for rotation, x in engine.placements(name)]
+    scores = evaluate_moves(engine, name, moves, network)
+    best = int(scores.argmax())
+    return moves[best], float(scores[best])
 
-    cleared_lines = sum(1 for row in range(board.height) if board.is_full(row))
-    return network.weights.dot((aggregate_height, cleared_lines, holes, bumpiness))
 
+def generate_best_placement(engine: Engine, network: Network) -> Tuple[Move, bool]:
+    """ Returns the best placement according to the current and held/next tetromino of a headless engine. """
+    best_move, best_score = _best_placement(engine, engine.current_tetromino, network)
+    alternative_tetromino = engine.alternative_tetromino
+    if alternative_tetromino is None:
+        return best_move, False
 
-def undo_move(tetris: Tetris, copy: ActiveTetromino) -> None:
-    tetromino = tetris.current_tetromino
-    for i, j in tetromino.rotation:
-        if tetromino.y + j >= 0:
-            tetris.board[tetromino.y + j][tetromino.x + i] = None
-
-    tetromino.x = copy.x
-    tetromino.y = copy.y
-    tetromino.rotation_index = copy.rotation_index
-
-
-def _best_move(tetris: Tetris, network: Network):
-    """ Finds the best move according to the current tetromino. """
-    best_move = None
-    best_score = -inf
-    copy = tetris.current_tetromino.copy()
-    for move in get_moves(tetris.current_tetromino):
-        do_move(tetris, move)
-        score = score_board(tetris.board, network)
-        undo_move(tetris, copy)
-
-        if score > best_score:
-            best_move = move
-            best_score = score
-    return best_move, best_score
-
-
-def generate_best_move(tetris: Tetris, network: Network) -> Tuple[Move, bool]:
-    """ Returns the best move according to the current and held/next tetromino. """
-    tetris_score = tetris.score
-    best_move, best_score = _best_move(tetris, network)
-    tetris.hold()
-    alt_best_move, alt_best_score = _best_move(tetris, network)
-    tetris.unhold()
+    alt_best_move, alt_best_score = _best_placement(engine, alternative_tetromino, network)
     use_alt_move = best_score < alt_best_score
-    tetris.score = tetris_score
     return alt_best_move if use_alt_move else best_move, use_alt_move
+
+
+def generate_best_actions(vector_engine: VectorEngine, weights: np.ndarray) -> np.ndarray:
+    """
+    Picks the best action of every game in a vector engine in one vectorized pass, without holding.
+    :param vector_engine: the games to pick actions for
+    :param weights: an (N, len(FEATURES)) array with the weights of the network playing each game
+    :return: the index of every game's best action into its current tetromino's actions
+    """
+    afterstates, valid = vector_engine.afterstates()
+    num_of_games, num_of_actions, height = afterstates.shape
+    features = get_features(afterstates.reshape(-1, height), vector_engine.width).reshape(num_of_games, num_of_actions, -1)
+    scores = np.einsum('naf,nf->na', features, weights)
+    return np.where(valid, scores, -inf).argmax(axis=1)
@@ -0,0 +1,47 @@
+from collections import OrderedDict
+from typing import Hashable, Optional
+
+
+class EvaluationCache:
+    def __init__(self, maxsize: int = 1 << 16) -> None:
+        """
+        A least recently used cache of board evaluations, keyed by board hash.
+        Evaluations depend on the network, so a cache should only be shared between searches of the same network.
+        :param maxsize: maximum number of evaluations kept, the least recently used ones are evicted first
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.__values = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[float]:
+        """ Returns the cached evaluation of the key, or None if it isn't cached. """
+        value = self.__values.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.__values.move_to_end(key)
+        return value
+
+    def put(self, key: Hashable, value: float) -> None:
+        self.__values[key] = value
+        self.__values.move_to_end(key)
+        if len(self.__values) > self.maxsize:
+            self.__values.popitem(last=False)
+
+    def clear(self) -> None:
+        self.__values.clear()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0
+
+    def __len__(self) -> int:
+        return len(self.__values)
+
+    def __repr__(self) -> str:
+        return f'EvaluationCache(size={len(self)}, maxsize={self.maxsize}, hits={self.hits}, misses={self.misses})'
@@ -0,0 +1,87 @@
+from typing import Iterable, Optional, Sequence, Union
+
+import numpy as np
+
+from pytris.ai.cache import EvaluationCache
+from pytris.ai.network import Network
+from pytris.bitboard import BitBoard
+from pytris.engine import Engine
+from pytris.tetromino import SHAPES
+
+FEATURES = ('aggregate_height', 'cleared_lines', 'holes', 'bumpiness')
+
+
+def stack_boards(board: Union[BitBoard, Engine], name: str, moves: Iterable) -> np.ndarray:
+    """
+    Stacks the board once for every move, with the tetromino placed on it at the move's position.
+    :param board: the board the tetromino is placed on
+    :param name: name of the tetromino
+    :param moves: objects with rotation, x and y attributes, such as algorithm.Move
+    :return: an (n, height) array of row bitmasks, one row of the array per move
+    """
+    moves = list(moves)
+    boards = np.tile(np.array(board.rows, dtype=np.int64), (len(moves), 1))
+    shapes = SHAPES[name]
+    for k, move in enumerate(moves):
+        for j, mask in shapes[move.rotation].row_masks:
+            if move.y + j >= 0:
+                boards[k, move.y + j] |= mask << move.x if move.x >= 0 else mask >> -move.x
+    return boards
+
+
+def get_features(boards: np.ndarray, width: int) -> np.ndarray:
+    """
+    Computes the features of a stack of boards in one vectorized pass.
+    :param boards: an (n, height) array of row bitmasks
+    :param width: number of columns in each board
+    :return: an (n, len(FEATURES)) array with the aggregate height, cleared lines, holes and bumpiness of each board
+    """
+    height = boards.shape[1]
+    cells = (boards[:, :, np.newaxis] >> np.arange(width, dtype=np.int64)) & 1 == 1
+    col_heights = np.where(cells.any(axis=1), height - cells.argmax(axis=1), 0)
+    aggregate_height = col_heights.sum(axis=1)
+    cleared_lines = (boards == (1 << width) - 1).sum(axis=1)
+    # an empty cell right below an occupied one
+    holes = (cells[:, :-1] & ~cells[:, 1:]).sum(axis=(1, 2))
+    bumpiness = np.abs(np.diff(col_heights, axis=1)).sum(axis=1)
+    return np.stack((aggregate_height, cleared_lines, holes, bumpiness), axis=1)
+
+
+def score_boards(boards: np.ndarray, width: int, network: Network) -> np.ndarray:
+    """ Returns the network's score of every board in the stack. """
+    return get_features(boards, width) @ np.asarray(network.weights)
+
+
+def evaluate_moves(board: Union[BitBoard, Engine], name: str, moves: Sequence, network: Network,
+                   cache: Optional[EvaluationCache] = None, cleared_lines: int = 0) -> np.ndarray:
+    """
+    Returns the network's score of the board after placing the tetromino at each of the moves.
+    :param board: the board the tetromino is placed on
+    :param name: name of the tetromino
+    :param moves: objects with rotation, x and y attributes, such as algorithm.Move
+    :param network: the network scoring the boards
+    :param cache: evaluations are looked up here by board hash first, and only the missing ones are computed and added,
+                  only BitBoards are hashed
+    :param cleared_lines: lines cleared before this placement, which count towards the cleared lines feature
+    """
+    if cache is None:
+        features = get_features(stack_boards(board, name, moves), board.width)
+        features[:, 1] += cleared_lines
+        return features @ np.asarray(network.weights)
+
+    shapes = SHAPES[name]
+    keys = [(board.placed_hash(shapes[move.rotation], move.x, move.y), cleared_lines) for move in moves]
+    values = np.empty(len(moves))
+    missing = []
+    for k, key in enumerate(keys):
+        value = cache.get(key)
+        if value is None:
+            missing.append(k)
+        else:
+            values[k] = value
+
+    if missing:
+        values[missing] = evaluate_moves(board, name, [moves[k] for k in missing], network, cleared_lines=cleared_lines)
+        for k in missing:
+            cache.put(keys[k], float(values[k]))
+    return values
@@ -0,0 +1,268 @@
+import selectors
+import socket
+from abc import ABC, abstractmethod
+from collections import deque
+from multiprocessing import Pool
+from multiprocessing.shared_memory import SharedMemory
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+from tqdm import tqdm
+
+from pytris.ai.network import Network
+from pytris.ai.population import Population
+from pytris.ai.protocol import CLOSE, HELLO, RESULT, Connection, get_function_name
+from pytris.ai.racing import RacingEvaluator
+
+# the evaluation functions also receive the seed of the generation's games
+EvaluationFunction = Callable[[Network, int], float]
+PopulationEvaluationFunction = Callable[[List[Network], int], List[float]]
+# set once in every worker process of a shared memory pool, and reused across generations
+_worker_weights: Optional[np.ndarray] = None
+_worker_fitnesses: Optional[np.ndarray] = None
+_worker_evaluation_function: Optional[EvaluationFunction] = None
+_worker_memory: Tuple[SharedMemory, ...] = ()
+
+
+def _init_worker(weights_name: str, fitnesses_name: str, shape: Tuple[int, int],
+                 evaluation_function: EvaluationFunction) -> None:
+    """ Attaches a worker process to the shared weight matrix and fitness array. """
+    global _worker_weights, _worker_fitnesses, _worker_evaluation_function, _worker_memory
+    weights_memory, fitnesses_memory = SharedMemory(weights_name), SharedMemory(fitnesses_name)
+    _worker_memory = weights_memory, fitnesses_memory
+    _worker_weights = np.ndarray(shape, dtype=np.float64, buffer=weights_memory.buf)
+    _worker_fitnesses = np.ndarray(shape[:1], dtype=np.float64, buffer=fitnesses_memory.buf)
+    _worker_evaluation_function = evaluation_function
+
+
+def _evaluate_range(task: Tuple[int, int, int]) -> int:
+    """ Evaluates the networks in the given rows of the shared weight matrix with the given seed, returns their number. """
+    start, stop, seed = task
+    for i in range(start, stop):
+        _worker_fitnesses[i] = _worker_evaluation_function(Network.from_weights(_worker_weights[i]), seed)
+    return stop - start
+
+
+def get_chunks(size: int, chunk_size: int) -> List[Tuple[int, int]]:
+    """ Splits 'size' rows into consecutive [start, stop) ranges of at most 'chunk_size' rows. """
+    return [(start, min(start + chunk_size, size)) for start in range(0, size, chunk_size)]
+
+
+class Executor(ABC):
+    """ Evaluates whole populations, Trainer only talks to this interface. """
+
+    @abstractmethod
+    def evaluate(self, population: Population, seed: int, description: str = None) -> None:
+        """
+        Sets the fitness of every network in the population.
+        :param population: the population, its fitnesses are written in place
+        :param seed: seed every network is evaluated with
+        :param description: label of the progress bar, if the executor shows one
+        """
+
+    def close(self) -> None:
+        """ Releases the executor's workers and resources. """
+
+    def __enter__(self) -> 'Executor':
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+
+class LocalExecutor(Executor):
+    def __init__(self, population_evaluation_function: PopulationEvaluationFunction) -> None:
+        """ Evaluates every population as a whole in this process, for example with a VectorEngine. """
+        self.population_evaluation_function = population_evaluation_function
+
+    def evaluate(self, population: Population, seed: int, description: str = None) -> None:
+        population.fitnesses[:] = self.population_evaluation_function(list(population), seed)
+
+
+class PoolExecutor(Executor):
+    def __init__(self, evaluation_function: EvaluationFunction, concurrency: int = None) -> None:
+        """ Evaluates every network in its own task of a process pool. """
+        self.evaluation_function = evaluation_function
+        self.pool = Pool(concurrency)
+
+    def evaluate(self, population: Population, seed: int, description: str = None) -> None:
+        fitnesses = {network: self.pool.apply_async(self.evaluation_function, args=(network, seed))
+                     for network in population}
+        for network, fitness in tqdm(fitnesses.items(), desc=description):
+            population[network] = fitness.get()
+
+    def close(self) -> None:
+        self.pool.close()
+        self.pool.join()
+
+
+class SharedMemoryExecutor(Executor):
+    def __init__(self, evaluation_function: EvaluationFunction, shape: Tuple[int, int], concurrency: int = None,
+                 chunk_size: int = 4) -> None:
+        """
+        Evaluates populations with persistent workers that share a weight matrix and a fitness array, so each task only
+        sends a range of row indices and each result is written in place.
+        :param evaluation_function: function that receives a network and a seed and outputs its fitness
+        :param shape: the (population_size, network_size) of every population
+        :param concurrency: number of worker processes
+        :param chunk_size: number of networks each worker evaluates per task
+        """
+        self.shape = shape
+        self.chunk_size = chunk_size
+        self.weights_memory = SharedMemory(create=True, size=max(shape[0] * shape[1], 1) * 8)
+        self.fitnesses_memory = SharedMemory(create=True, size=max(shape[0], 1) * 8)
+        self.weights = np.ndarray(shape, dtype=np.float64, buffer=self.weights_memory.buf)
+        self.fitnesses = np.ndarray(shape[:1], dtype=np.float64, buffer=self.fitnesses_memory.buf)
+        self.pool = Pool(concurrency, initializer=_init_worker,
+                         initargs=(self.weights_memory.name, self.fitnesses_memory.name, shape, evaluation_function))
+
+    def evaluate(self, population: Population, seed: int, description: str = None) -> None:
+        """ Populations may be smaller than the shape, such as the networks still racing, they use the first rows. """
+        self.weights[:len(population)] = population.weights
+        chunks = [(start, stop, seed) for start, stop in get_chunks(len(population), self.chunk_size)]
+        with tqdm(total=len(population), desc=description) as progress_bar:
+            for evaluated in self.pool.imap_unordered(_evaluate_range, chunks):
+                progress_bar.update(evaluated)
+        population.fitnesses[:] = self.fitnesses[:len(population)]
+
+    def close(self) -> None:
+        self.pool.close()
+        self.pool.join()
+        del self.weights, self.fitnesses
+        for memory in (self.weights_memory, self.fitnesses_memory):
+            memory.close()
+            memory.unlink()
+
+
+class RacingExecutor(Executor):
+    def __init__(self, executor: Executor, num_of_rounds: int, num_of_survivors: int) -> None:
+        """
+        Races every population on another executor, see RacingEvaluator. Every round evaluates the networks that are
+        still racing once, as a population of their own, with a seed of its own.
+        :param executor: executor every round is evaluated on, it's closed with this executor
+        :param num_of_rounds: number of rounds a network that's never dropped plays
+        :param num_of_survivors: number of networks that must be ranked reliably
+        """
+        self.executor = executor
+        self.racing_evaluator = RacingEvaluator(self.evaluate_round, num_of_rounds, num_of_survivors)
+        self.description: Optional[str] = None
+
+    def evaluate_round(self, networks: List[Network], seed: int) -> List[float]:
+        population = Population(np.stack([np.asarray(network.weights) for network in networks]))
+        self.executor.evaluate(population, seed, self.description)
+        return population.fitnesses.tolist()
+
+    def evaluate(self, population: Population, seed: int, description: str = None) -> None:
+        self.description = description
+        population.fitnesses[:] = self.racing_evaluator(list(population), seed)
+
+    def close(self) -> None:
+        self.executor.close()
+
+
+class SocketExecutor(Executor):
+    def __init__(self, evaluation_function: EvaluationFunction, host: str = 'localhost', port: int = 0,
+                 min_workers: int = 1, chunk_size: int = 4, timeout: float = None) -> None:
+        """
+        Evaluates populations on workers that connect over TCP, possibly from other machines, see pytris.ai.worker.
+        Every worker is sent the evaluation function's name once, and then one chunk of rows at a time, the chunk of a
+        worker that disconnects goes back to the queue. Workers may join at any time.
+        :param evaluation_function: module level function that receives a network and a seed and outputs its fitness,
+                                    workers import it by name
+        :param host: address to listen on
+        :param port: port to listen on, any free port by default, see 'address'
+        :param min_workers: number of workers to wait for before evaluating
+        :param chunk_size: number of networks sent to a worker per task
+        :param timeout: seconds to wait for any worker event before giving up, forever by default
+        """
+        self.function_name = get_function_name(evaluation_function)
+        self.min_workers = min_workers
+        self.chunk_size = chunk_size
+        self.timeout = timeout
+        self.server = socket.create_server((host, port))
+        self.server.setblocking(False)
+        self.selector = selectors.DefaultSelector()
+        self.selector.register(self.server, selectors.EVENT_READ)
+        self.connections: Dict[socket.socket, Connection] = {}
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        """ The (host, port) workers connect to. """
+        return self.server.getsockname()[:2]
+
+    def accept(self) -> None:
+        sock, _ = self.server.accept()
+        sock.setblocking(True)
+        connection = Connection(sock)
+        connection.send(HELLO, self.function_name.encode())
+        self.connections[sock] = connection
+        self.selector.register(sock, selectors.EVENT_READ)
+
+    def disconnect(self, sock: socket.socket) -> None:
+        self.selector.unregister(sock)
+        self.connections.pop(sock).close()
+
+    def drop(self, sock: socket.socket, assigned: Dict[socket.socket, Tuple[int, int]],
+             chunks: Deque[Tuple[int, int]]) -> None:
+        """ Disconnects a worker that left or misbehaved, its chunk goes back to the front of the queue. """
+        if sock in assigned:
+            chunks.appendleft(assigned.pop(sock))
+        self.disconnect(sock)
+
+    def wait(self) -> List[socket.socket]:
+        """ Waits for workers to connect or send results, accepts new workers and returns the sockets with results. """
+        events = self.selector.select(self.timeout)
+        if not events:
+            raise TimeoutError(f'No worker responded within {self.timeout} seconds')
+
+        ready = []
+        for key, _ in events:
+            if key.fileobj is self.server:
+                self.accept()
+            else:
+                ready.append(key.fileobj)
+        return ready
+
+    @staticmethod
+    def is_result(message: Optional[Tuple[int, bytes]], chunk: Optional[Tuple[int, int]]) -> bool:
+        """ Returns whether the message is a result for the worker's chunk, one float64 fitness per network in it. """
+        return message is not None and message[0] == RESULT and chunk is not None \
+            and len(message[1]) == (chunk[1] - chunk[0]) * 8
+
+    def evaluate(self, population: Population, seed: int, description: str = None) -> None:
+        while len(self.connections) < self.min_workers:
+            self.wait()
+
+        chunks: Deque[Tuple[int, int]] = deque(get_chunks(len(population), self.chunk_size))
+        assigned: Dict[socket.socket, Tuple[int, int]] = {}
+        with tqdm(total=len(population), desc=description) as progress_bar:
+            while chunks or assigned:
+                for sock, connection in list(self.connections.items()):
+                    if sock not in assigned and chunks:
+                        start, stop = assigned[sock] = chunks.popleft()
+                        try:
+                            connection.send_task(seed, population.weights[start:stop])
+                        except OSError:
+                            self.drop(sock, assigned, chunks)
+
+                for sock in self.wait():
+                    message = self.connections[sock].receive()
+                    if not self.is_result(message, assigned.get(sock)):
+                        self.drop(sock, assigned, chunks)
+                        continue
+
+                    start, stop = assigned.pop(sock)
+                    population.fitnesses[start:stop] = np.frombuffer(message[1], dtype=np.float64)
+                    progress_bar.update(stop - start)
+
+    def close(self) -> None:
+        for sock, connection in list(self.connections.items()):
+            # a worker that already died doesn't need to be told
+            try:
+                connection.send(CLOSE)
+            except OSError:
+                pass
+            self.disconnect(sock)
+        self.selector.unregister(self.server)
+        self.selector.close()
+        self.server.close()
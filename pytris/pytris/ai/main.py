@@ -1,50 +1,100 @@
 import os
+from functools import partial
+from random import Random
+from typing import List, Optional
+
+import numpy as np
 
 from pytris import Tetris
-from pytris.ai.algorithm import generate_best_move
+from pytris.ai.algorithm import apply_move, generate_best_actions, generate_best_placement
+from pytris.ai.cache import EvaluationCache
 from pytris.ai.network import Network
+from pytris.ai.search import search_best_move
 from pytris.ai.trainer import Trainer
+from pytris.engine import Engine
+from pytris.vector_engine import VectorEngine
+
 
+def get_game_seeds(seed: Optional[int], num_of_games: int) -> List[int]:
+    """ Returns the seed of every game in an evaluation, networks evaluated with the same seed play the same games. """
+    random = Random(seed)
+    return [random.getrandbits(32) for _ in range(num_of_games)]
 
-def tetris_evaluation(network: Network) -> float:
-    """ Returns the number of lines cleared in 'n' moves and 'm' games. """
+
+def tetris_evaluation(network: Network, seed: Optional[int] = None, depth: int = 1, beam_width: int = 8,
+                      num_of_games: int = 3) -> float:
+    """ Returns the number of lines cleared in 'n' moves and 'm' games, looking 'depth' tetrominoes ahead every move. """
     fitness = 0
     tetris = Tetris(10, 20, 0)
-    num_of_games = 3
     num_of_moves = 100
-    for _ in range(num_of_games):
-        tetris.reset()
+    cache = EvaluationCache()
+    for game_seed in get_game_seeds(seed, num_of_games):
+        tetris.reset(game_seed)
         for _ in range(num_of_moves):
             if tetris.terminal:
                 break
 
-            best_move, use_alt_move = generate_best_move(tetris, network)
+            best_move, use_alt_move = search_best_move(tetris, network, depth, beam_width, cache=cache)
             if use_alt_move:
                 tetris.hold()
 
-            for _ in range(best_move.rotation):
-                tetris.rotate_right()
+            apply_move(tetris, best_move)
+        fitness += tetris.cleared_lines
+    return fitness
 
-            for _ in range(best_move.right):
-                tetris.move_right()
 
-            for _ in range(best_move.left):
-                tetris.move_left()
+def engine_evaluation(network: Network, seed: Optional[int] = None) -> float:
+    """ Returns the number of lines cleared in 'n' moves and 'm' games, played on the headless engine. """
+    fitness = 0
+    engine = Engine(10, 20)
+    num_of_games = 3
+    num_of_moves = 100
+    for game_seed in get_game_seeds(seed, num_of_games):
+        engine.reset(game_seed)
+        for _ in range(num_of_moves):
+            best_move, use_alt_move = generate_best_placement(engine, network)
+            if use_alt_move:
+                engine.hold()
 
-            tetris.hard_drop()
-            tetris.lock()
-        fitness += tetris.cleared_lines
+            _, terminal = engine.place(best_move.rotation, best_move.x)
+            if terminal:
+                break
+        fitness += engine.cleared_lines
     return fitness
 
 
-def main() -> None:
+def vectorized_evaluation(networks: List[Network], seed: Optional[int] = None, num_of_games: int = 3,
+                          num_of_moves: int = 100) -> List[float]:
+    """ Returns the number of lines cleared in 'n' moves and 'm' games by every network, all games played in lockstep. """
+    weights = np.stack([np.asarray(network.weights) for network in networks])
+    vector_engine = VectorEngine(len(networks) * num_of_games, 10, 20,
+                                 get_game_seeds(seed, num_of_games) * len(networks))
+    weights = np.repeat(weights, num_of_games, axis=0)
+    for _ in range(num_of_moves):
+        _, terminal = vector_engine.step(generate_best_actions(vector_engine, weights))
+        if terminal.all():
+            break
+    return vector_engine.cleared_lines.reshape(len(networks), num_of_games).sum(axis=1).tolist()
+
+
+def main(vectorized: bool = False) -> None:
+    """
+    Trains the network the game's AI plays with.
+    :param vectorized: whether to evaluate every generation at once on a VectorEngine, which is much faster, but only
+                       drops tetrominoes straight down without holding, so it trains for a different policy than the
+                       one the game's AI plays with
+    """
     log_folder = os.path.join(os.path.dirname(__file__), 'logs')
     if not os.path.exists(log_folder):
         os.mkdir(log_folder)
 
+    # every round plays one game, networks that are never dropped play the same 3 games as without racing
+    population_evaluation_function = partial(vectorized_evaluation, num_of_games=1) if vectorized else None
     Trainer.run(generations=3, population_size=50, network_size=4, mutation_power=.3, mutation_chance=.75,
-                offspring_percentage=.5, parent_candidates_percentage=.3, evaluation_function=tetris_evaluation,
-                log_folder=log_folder, concurrency=36)
+                offspring_percentage=.5, parent_candidates_percentage=.3,
+                evaluation_function=partial(tetris_evaluation, num_of_games=1), log_folder=log_folder, concurrency=36,
+                population_evaluation_function=population_evaluation_function, racing_rounds=3,
+                checkpoint_path=os.path.join(log_folder, 'checkpoint.npz'))
 
 
 if __name__ == '__main__':
@@ -1,21 +1,27 @@
-from dataclasses import dataclass, field
+from dataclasses import InitVar, dataclass, field
 from functools import cached_property
-from random import uniform
+from typing import Iterable, Union
 from uuid import UUID, uuid4
 
+import numpy as np
+
 from pytris.utils.vector import Vector
 
 
 @dataclass(frozen=True)
 class Network:
     id: UUID = field(default_factory=uuid4, init=False)
-    weights: Vector = field(hash=False)
+    weights: Vector = field(hash=False, compare=False)
+    normalize: InitVar[bool] = True
 
-    def __post_init__(self) -> None:
-        self.weights.normalize()
+    def __post_init__(self, normalize: bool) -> None:
+        # a float row of a population's weight matrix stays a view into it, anything else is copied into a new vector
+        object.__setattr__(self, 'weights', Vector(self.weights))
+        if normalize:
+            self.weights.normalize()
 
     def mutate(self, power: float) -> None:
-        self.weights.__iadd__(uniform(-power, power) for _ in range(self.size))
+        self.weights.axpy(power, np.random.uniform(-1, 1, self.size))
         self.weights.normalize()
 
     @cached_property
@@ -25,3 +31,8 @@ class Network:
     @classmethod
     def random(cls, size: int) -> 'Network':
         return cls(Vector.random(size))
+
+    @classmethod
+    def from_weights(cls, weights: Union[np.ndarray, Iterable[float]]) -> 'Network':
+        """ Creates a network with a copy of the given weights. """
+        return cls(Vector(np.array(weights, dtype=np.float64)))
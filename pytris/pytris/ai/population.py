@@ -1,13 +1,52 @@
-from heapq import nlargest
-from random import choices, random
-from typing import Dict, Iterator
+import json
+import os
+from typing import Dict, Iterator, List, MutableMapping, Optional
+
+import numpy as np
 
 from pytris.ai.network import Network
 
 
+def normalize_rows(weights: np.ndarray) -> np.ndarray:
+    """ Scales every row of the weight matrix, in place, to a magnitude of 1. """
+    weights /= np.linalg.norm(weights, axis=1, keepdims=True)
+    return weights
+
+
+class Population(MutableMapping[Network, float]):
+    def __init__(self, weights: np.ndarray, fitnesses: Optional[np.ndarray] = None) -> None:
+        """
+        A population stored as one contiguous (population_size, network_size) weight matrix, with each network being a
+        view into its row, mapped to its fitness.
+        :param weights: the weight matrix, every row normalized
+        :param fitnesses: the fitness of every row, zeros by default
+        """
+        self.weights = weights
+        self.fitnesses = np.zeros(len(weights)) if fitnesses is None else fitnesses
+        # the rows are normalized already, normalizing them again could change their last bits
+        self.networks: List[Network] = [Network(row, normalize=False) for row in weights]
+        self.__indices: Dict[Network, int] = {network: i for i, network in enumerate(self.networks)}
+
+    def __getitem__(self, network: Network) -> float:
+        return float(self.fitnesses[self.__indices[network]])
+
+    def __setitem__(self, network: Network, fitness: float) -> None:
+        self.fitnesses[self.__indices[network]] = fitness
+
+    def __delitem__(self, network: Network) -> None:
+        raise TypeError('Networks can\'t be removed from a population')
+
+    def __iter__(self) -> Iterator[Network]:
+        return iter(self.networks)
+
+    def __len__(self) -> int:
+        return len(self.networks)
+
+
 class PopulationGenerator:
     def __init__(self, generations: int, population_size: int, network_size: int, mutation_power: float,
-                 mutation_chance: float, offspring_percentage: float, parent_candidates_percentage: float) -> None:
+                 mutation_chance: float, offspring_percentage: float, parent_candidates_percentage: float,
+                 seed: Optional[int] = None) -> None:
         """
         Generates population using the applied fitnesses evaluated during training.
         :param generations: number of populations
@@ -17,12 +56,16 @@ class PopulationGenerator:
         :param mutation_chance: chance for each individual network to mutate
         :param offspring_percentage: percentage of offspring out of population_size
         :param parent_candidates_percentage: percentage of parent candidates out of population_size
+        :param seed: seed of the initial population, the crossovers and the evaluation seed of every generation
         """
         self.__generation = 0
         self.__generations = generations
         self.__population_size = population_size
+        self.__network_size = network_size
 
-        self.__networks = {Network.random(network_size): 0 for _ in range(population_size)}
+        self.seed = seed if seed is not None else int(np.random.SeedSequence().entropy)
+        self.random = np.random.default_rng(self.seed)
+        self.__networks = Population(normalize_rows(self.random.uniform(-1, 1, (population_size, network_size))))
 
         self.mutation_power = mutation_power
         self.mutation_chance = mutation_chance
@@ -32,7 +75,7 @@ class PopulationGenerator:
     def __iter__(self) -> 'PopulationGenerator':
         return self
 
-    def __next__(self) -> Dict[Network, float]:
+    def __next__(self) -> Population:
         """ Returns the next population after applying crossover. """
         if self.generation < self.generations:
             if self.generation != 0:
@@ -45,37 +88,89 @@ class PopulationGenerator:
 
     def crossover(self) -> None:
         """ Picks the strongest networks in the current population, and replaces the weakest with newborn networks. """
-        strongest_networks = nlargest(n=self.population_size - self.num_of_offspring,
-                                      iterable=self.networks.keys(),
-                                      key=lambda network: self.networks[network])
-        self.__networks = {child: 0 for child in self.offspring}
-        self.__networks.update({network: 0 for network in strongest_networks})
+        # a stable sort keeps the earlier network first among equal fitnesses, like heapq.nlargest
+        order = np.argsort(-self.networks.fitnesses, kind='stable')
+        strongest = self.networks.weights[order[:self.num_of_survivors]]
+        self.__networks = Population(np.concatenate((self.offspring, strongest)))
+
+    def save(self, path: str) -> None:
+        """
+        Saves the generator to a compressed .npz checkpoint, the weights and fitnesses of the current population, the
+        generation counter, the training parameters and the random generator's state. The file is written next to the
+        path first and then moved over it, so an interrupted save keeps the previous checkpoint.
+        """
+        temporary_path = f'{path}.tmp'
+        with open(temporary_path, 'wb') as f:
+            np.savez_compressed(f, weights=self.networks.weights, fitnesses=self.networks.fitnesses,
+                                generation=self.generation, generations=self.generations,
+                                mutation_power=self.mutation_power, mutation_chance=self.mutation_chance,
+                                num_of_offspring=self.num_of_offspring,
+                                num_of_parent_candidates=self.num_of_parent_candidates,
+                                seed=str(self.seed), random_state=json.dumps(self.random.bit_generator.state))
+        os.replace(temporary_path, path)
+
+    @classmethod
+    def load(cls, path: str, generations: Optional[int] = None) -> 'PopulationGenerator':
+        """
+        Loads a generator saved with save, it continues exactly where the saved one would have.
+        :param path: path of the checkpoint
+        :param generations: number of populations to generate in total, the saved number by default
+        """
+        with np.load(path) as checkpoint:
+            weights, fitnesses = checkpoint['weights'], checkpoint['fitnesses']
+            population_size, network_size = weights.shape
+            generator = cls(generations or int(checkpoint['generations']), population_size, network_size,
+                            float(checkpoint['mutation_power']), float(checkpoint['mutation_chance']), 0, 0,
+                            int(str(checkpoint['seed'])))
+            generator.num_of_offspring = int(checkpoint['num_of_offspring'])
+            generator.num_of_parent_candidates = int(checkpoint['num_of_parent_candidates'])
+            generator.__generation = int(checkpoint['generation'])
+            generator.__networks = Population(weights, fitnesses)
+            generator.random.bit_generator.state = json.loads(str(checkpoint['random_state']))
+        return generator
 
     @property
-    def offspring(self) -> Iterator[Network]:
+    def offspring(self) -> np.ndarray:
         """
         For each offspring, we randomly select a number of networks from the population, and pick
         the top two networks from the sample. We combine these two networks using the following formula:
         if w = parent1_weights * parent1_fitness + parent2_weights * parent2_fitness
         then child_weights = w / |w|
         Then, there is a random chance to mutate the child network, altering its values by a certain amount.
-        :return: Yields a network
+        All offspring are computed at once, as rows of one matrix.
+        :return: a (num_of_offspring, network_size) weight matrix
         """
-        all_candidates = tuple(self.networks.items())
-        for _ in range(self.num_of_offspring):
-            (parent1, fitness1), (parent2, fitness2) = nlargest(n=2, key=lambda pair: pair[1],
-                                                                iterable=choices(all_candidates,
-                                                                                 k=self.num_of_parent_candidates))
-            child = Network(parent1.weights * fitness1 + parent2.weights * fitness2)
+        weights, fitnesses = self.networks.weights, self.networks.fitnesses
+        candidates = self.random.integers(0, self.population_size, (self.num_of_offspring, self.num_of_parent_candidates))
+        top_two = np.argsort(-fitnesses[candidates], axis=1, kind='stable')[:, :2]
+        parents = np.take_along_axis(candidates, top_two, axis=1)
+        children = np.einsum('opf,op->of', weights[parents], fitnesses[parents])
+        # parents without any fitness carry no weight, so the child is their unweighted sum instead
+        unweighted = ~children.any(axis=1)
+        children[unweighted] = weights[parents[unweighted]].sum(axis=1)
+        normalize_rows(children)
+
+        mutated = self.random.random(self.num_of_offspring) < self.mutation_chance
+        children[mutated] += self.random.uniform(-self.mutation_power, self.mutation_power,
+                                                 (int(mutated.sum()), self.network_size))
+        return normalize_rows(children)
 
-            if random() < self.mutation_chance:
-                child.mutate(self.mutation_power)
+    @property
+    def num_of_survivors(self) -> int:
+        """ The number of strongest networks crossover keeps, only their ranking among the rest matters. """
+        return self.population_size - self.num_of_offspring
 
-            yield child
+    @property
+    def evaluation_seed(self) -> int:
+        """
+        The seed every network of the current generation is evaluated with, so they all play the same games and their
+        fitnesses differ by the networks alone. It depends only on the seed and the generation, not on the crossovers.
+        """
+        return int(np.random.SeedSequence((self.seed, self.generation)).generate_state(1)[0])
 
     @property
-    def networks(self) -> Dict[Network, float]:
-        """ A dict of a network mapped to its fitness. """
+    def networks(self) -> Population:
+        """ The current population, a mapping of a network to its fitness. """
         return self.__networks
 
     @property
@@ -89,3 +184,7 @@ class PopulationGenerator:
     @property
     def population_size(self) -> int:
         return self.__population_size
+
+    @property
+    def network_size(self) -> int:
+        return self.__network_size
@@ -0,0 +1,73 @@
+import importlib
+import socket
+import struct
+from typing import Callable, Optional, Tuple
+
+import numpy as np
+
+# message types, every message is a type and a payload length followed by the payload
+HELLO, TASK, RESULT, CLOSE = range(4)
+HEADER = struct.Struct('!BI')
+# a task's payload is the seed, the number of networks and their size, followed by their float64 weights
+TASK_HEADER = struct.Struct('!QII')
+
+
+def get_function_name(function: Callable) -> str:
+    """ Returns the 'module:qualified_name' a worker imports a module level function by. """
+    return f'{function.__module__}:{function.__qualname__}'
+
+
+def import_function(name: str) -> Callable:
+    """ Imports a function by its 'module:qualified_name'. """
+    module_name, qualified_name = name.split(':')
+    function = importlib.import_module(module_name)
+    for attribute in qualified_name.split('.'):
+        function = getattr(function, attribute)
+    return function
+
+
+class Connection:
+    def __init__(self, sock: socket.socket) -> None:
+        """ Sends and receives length prefixed messages over a blocking socket. """
+        self.sock = sock
+
+    def send(self, kind: int, payload: bytes = b'') -> None:
+        self.sock.sendall(HEADER.pack(kind, len(payload)) + payload)
+
+    def receive(self) -> Optional[Tuple[int, bytes]]:
+        """ Returns the next message's type and payload, or None if the other side closed the connection. """
+        header = self.receive_exactly(HEADER.size)
+        if header is None:
+            return None
+
+        kind, size = HEADER.unpack(header)
+        payload = self.receive_exactly(size)
+        return None if payload is None else (kind, payload)
+
+    def receive_exactly(self, size: int) -> Optional[bytes]:
+        data = bytearray()
+        while len(data) < size:
+            try:
+                chunk = self.sock.recv(size - len(data))
+            except ConnectionError:
+                return None
+
+            if not chunk:
+                return None
+            data += chunk
+        return bytes(data)
+
+    def send_task(self, seed: int, weights: np.ndarray) -> None:
+        """ Sends the weights of networks to evaluate, one network per row, and the seed to evaluate them with. """
+        weights = np.ascontiguousarray(weights, dtype=np.float64)
+        self.send(TASK, TASK_HEADER.pack(seed, *weights.shape) + weights.tobytes())
+
+    @staticmethod
+    def parse_task(payload: bytes) -> Tuple[int, np.ndarray]:
+        """ Returns the seed and the (networks, network_size) weight matrix of a task. """
+        seed, num_of_networks, network_size = TASK_HEADER.unpack_from(payload)
+        weights = np.frombuffer(payload, dtype=np.float64, offset=TASK_HEADER.size)
+        return seed, weights.reshape(num_of_networks, network_size)
+
+    def close(self) -> None:
+        self.sock.close()
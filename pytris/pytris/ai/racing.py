@@ -0,0 +1,83 @@
+import math
+from functools import lru_cache
+from random import Random
+from typing import Callable, List
+
+import numpy as np
+
+from pytris.ai.network import Network
+
+# receives networks and the seed of one round of games, and outputs the fitness of each network in that round
+RoundEvaluationFunction = Callable[[List[Network], int], List[float]]
+
+
+@lru_cache(maxsize=None)
+def get_t_quantile(confidence: float, degrees_of_freedom: int) -> float:
+    """ Returns the half width, in standard errors, of a two sided Student's t confidence interval. """
+    # the density is integrated numerically on a geometric grid, which is plenty accurate for confidence bounds
+    t = np.concatenate(((0.,), np.geomspace(1e-6, 1e6, 100001)))
+    log_scale = (math.lgamma((degrees_of_freedom + 1) / 2) - math.lgamma(degrees_of_freedom / 2)
+                 - .5 * math.log(degrees_of_freedom * math.pi))
+    density = np.exp(log_scale - (degrees_of_freedom + 1) / 2 * np.log1p(t ** 2 / degrees_of_freedom))
+    cumulative = np.concatenate(((0.,), np.cumsum((density[1:] + density[:-1]) / 2 * np.diff(t))))
+    return float(np.interp(confidence / 2, cumulative, t))
+
+
+class RacingEvaluator:
+    def __init__(self, round_evaluation_function: RoundEvaluationFunction, num_of_rounds: int, num_of_survivors: int,
+                 confidence: float = .95, min_rounds: int = 2, min_standard_deviation: float = 1.) -> None:
+        """
+        Evaluates a population one round at a time, and stops evaluating networks once they're clearly out of the
+        'num_of_survivors' strongest networks, which are the ones crossover keeps.
+        A network is dropped once the upper confidence bound of its mean round fitness is below the lower confidence
+        bound of 'num_of_survivors' other networks. A dropped network's fitness is its mean so far, scaled to all rounds.
+        The bounds are Student's t intervals, which stay wide while few rounds were played.
+        :param round_evaluation_function: function that receives networks and a seed and outputs each network's fitness in
+                                          one round, all networks in a round play the same games
+        :param num_of_rounds: number of rounds a network that's never dropped plays
+        :param num_of_survivors: number of networks that must be ranked reliably
+        :param confidence: two sided confidence level of each bound
+        :param min_rounds: number of rounds every network plays before any is dropped, at least 2
+        :param min_standard_deviation: floor of the standard deviation of a network's round fitnesses, so a network
+                                       whose few rounds happened to score the same doesn't get a zero width interval,
+                                       1 suits fitnesses counted in cleared lines
+        """
+        self.round_evaluation_function = round_evaluation_function
+        self.num_of_rounds = num_of_rounds
+        self.num_of_survivors = num_of_survivors
+        self.confidence = confidence
+        self.min_rounds = max(min_rounds, 2)
+        self.min_standard_deviation = min_standard_deviation
+        self.num_of_evaluations = 0
+
+    def __call__(self, networks: List[Network], seed: int) -> List[float]:
+        """ Races the networks, every round played with the same seeds for all of them. """
+        random = Random(seed)
+        fitnesses = np.zeros((len(networks), self.num_of_rounds))
+        num_of_played_rounds = np.zeros(len(networks), dtype=np.int64)
+        alive = np.ones(len(networks), dtype=bool)
+        for round_index in range(self.num_of_rounds):
+            round_seed = random.getrandbits(32)
+            indices = np.flatnonzero(alive)
+            fitnesses[indices, round_index] = self.round_evaluation_function([networks[i] for i in indices], round_seed)
+            num_of_played_rounds[indices] += 1
+            self.num_of_evaluations += len(indices)
+
+            if round_index + 1 >= self.min_rounds:
+                alive &= ~self.dropped(fitnesses, num_of_played_rounds)
+        return (fitnesses.sum(axis=1) / num_of_played_rounds * self.num_of_rounds).tolist()
+
+    def dropped(self, fitnesses: np.ndarray, num_of_played_rounds: np.ndarray) -> np.ndarray:
+        """ Returns a mask of the networks whose upper bound is below the lower bound of enough other networks. """
+        if self.num_of_survivors >= len(fitnesses):
+            return np.zeros(len(fitnesses), dtype=bool)
+
+        played = np.arange(fitnesses.shape[1]) < num_of_played_rounds[:, np.newaxis]
+        means = fitnesses.sum(axis=1) / num_of_played_rounds
+        variances = np.where(played, (fitnesses - means[:, np.newaxis]) ** 2, 0).sum(axis=1) / (num_of_played_rounds - 1)
+        variances = np.maximum(variances, self.min_standard_deviation ** 2)
+        quantiles = np.array([get_t_quantile(self.confidence, n - 1) for n in num_of_played_rounds])
+        errors = quantiles * np.sqrt(variances / num_of_played_rounds)
+        lower_bounds, upper_bounds = means - errors, means + errors
+        threshold = np.partition(lower_bounds, -self.num_of_survivors)[-self.num_of_survivors]
+        return upper_bounds < threshold
@@ -0,0 +1,115 @@
+from dataclasses import dataclass
+from heapq import nlargest
+from math import inf
+from time import perf_counter
+from typing import Dict, Hashable, List, Optional, Tuple
+
+from pytris import Tetris
+from pytris.ai.algorithm import Move, generate_best_state_move, get_moves
+from pytris.ai.cache import EvaluationCache
+from pytris.ai.evaluator import evaluate_moves
+from pytris.ai.network import Network
+from pytris.game_state import GameState
+
+
+@dataclass(frozen=True)
+class Node:
+    state: GameState
+    value: float
+    # the move and hold decision taken at the root, which is what the search eventually returns
+    first_move: Move
+    use_hold: bool
+
+
+def get_key(state: GameState) -> Hashable:
+    """ States with the same key play out identically from here on, so only the best valued one is kept. """
+    return tuple(state.board.rows), state.current_tetromino, state.held_tetromino, state.can_hold, state.tetromino_queue
+
+
+def expand(node: Node, network: Network, cleared_lines: int, cache: Optional[EvaluationCache], deadline: float = inf,
+           found: bool = False) -> List[Tuple[float, Node, GameState, Move, bool]]:
+    """
+    Returns a (value, parent, branch, move, use_hold) candidate for every move, with and without holding.
+    Once the deadline passed no further branch is expanded, unless no candidate was found yet in this search or node.
+    """
+    candidates = []
+    for branch, use_hold in ((node.state, False), (node.state.hold(), True)):
+        if (found or candidates) and perf_counter() > deadline:
+            break
+
+        if branch is None or branch.current_tetromino is None:
+            continue
+
+        moves = list(get_moves(branch.board, branch.active_tetromino))
+        if not moves:
+            continue
+
+        # lines cleared earlier along the path count towards the cleared lines feature
+        values = evaluate_moves(branch.board, branch.current_tetromino, moves, network, cache,
+                                cleared_lines=branch.cleared_lines - cleared_lines)
+        candidates.extend((float(value), node, branch, move, use_hold) for value, move in zip(values, moves))
+    return candidates
+
+
+def beam_search(state: GameState, network: Network, depth: int = 2, beam_width: int = 8,
+                time_budget: Optional[float] = None, cache: Optional[EvaluationCache] = None) -> Tuple[Optional[Move], bool]:
+    """
+    Looks 'depth' pieces ahead through the visible queue, keeping only the 'beam_width' best states after every ply.
+    :param state: the state to search from
+    :param network: the network used to evaluate boards
+    :param depth: number of pieces to place, limited by the length of the visible queue
+    :param beam_width: number of states kept after every ply
+    :param time_budget: seconds after which nothing more is expanded and the best state found so far is returned, only
+                        the placements of a single tetromino are always evaluated, so there is a move to return
+    :param cache: cache of board evaluations by the same network, shared between plies and searches
+    :return: the best move and whether the current tetromino should be held before it
+    """
+    deadline = perf_counter() + time_budget if time_budget is not None else inf
+    root = Node(state, 0, None, False)
+    beam = [root]
+    best = None
+    for _ in range(depth):
+        if best is not None and perf_counter() > deadline:
+            break
+
+        candidates = []
+        for node in beam:
+            # the beam is sorted by value, so a ply cut short by the deadline has expanded the most promising states
+            found = best is not None or bool(candidates)
+            if found and perf_counter() > deadline:
+                break
+
+            candidates.extend(expand(node, network, state.cleared_lines, cache, deadline, found))
+
+        transpositions: Dict[Hashable, Node] = {}
+        for value, parent, branch, move, use_hold in nlargest(beam_width * 2, candidates, key=lambda c: c[0]):
+            child = Node(state=branch.place(move.rotation, move.x, move.y),
+                         value=value,
+                         first_move=move if parent is root else parent.first_move,
+                         use_hold=use_hold if parent is root else parent.use_hold)
+            key = get_key(child.state)
+            if key not in transpositions or transpositions[key].value < child.value:
+                transpositions[key] = child
+
+        if not transpositions:
+            break
+
+        beam = nlargest(beam_width, transpositions.values(), key=lambda node: node.value)
+        best = beam[0]
+
+    if best is None:
+        return None, False
+    return best.first_move, best.use_hold
+
+
+def search_best_move(tetris: Tetris, network: Network, depth: int = 1, beam_width: int = 8,
+                     time_budget: Optional[float] = None,
+                     cache: Optional[EvaluationCache] = None) -> Tuple[Optional[Move], bool]:
+    """
+    Returns the best move for the game and whether to hold before it, without changing the game.
+    A depth of 1 scores the current and held/next tetromino like generate_best_move, deeper searches use beam_search.
+    """
+    state = GameState.from_tetris(tetris)
+    if depth <= 1:
+        return generate_best_state_move(state, network, cache)
+    return beam_search(state, network, depth, beam_width, time_budget, cache)
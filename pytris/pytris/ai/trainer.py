@@ -1,19 +1,21 @@
 import os
+import warnings
 from datetime import datetime
-from multiprocessing import Pool
-from typing import Callable
+from typing import TextIO
 
-from tqdm import tqdm
-
-from pytris.ai.network import Network
+from pytris.ai.executors import (EvaluationFunction, Executor, LocalExecutor, PoolExecutor, PopulationEvaluationFunction,
+                                 RacingExecutor, SharedMemoryExecutor)
 from pytris.ai.population import PopulationGenerator
 
 
 class Trainer:
     @staticmethod
     def run(generations: int, population_size: int, network_size: int, mutation_power: float, mutation_chance: float,
-            offspring_percentage: float, parent_candidates_percentage: float, evaluation_function: Callable[[Network], float],
-            log_folder: str = None, concurrency: int = None) -> None:
+            offspring_percentage: float, parent_candidates_percentage: float, evaluation_function: EvaluationFunction,
+            log_folder: str = None, concurrency: int = None,
+            population_evaluation_function: PopulationEvaluationFunction = None,
+            shared_memory: bool = False, chunk_size: int = 4, checkpoint_path: str = None, checkpoint_interval: int = 1,
+            resume: bool = False, seed: int = None, racing_rounds: int = None, executor: Executor = None) -> None:
         """
         Finds the best network in a population across multiple generations according to the specified evaluation_function.
         :param generations: number of populations
@@ -23,27 +25,76 @@ class Trainer:
         :param mutation_chance: chance for each individual network to mutate
         :param offspring_percentage: percentage of offspring out of population_size
         :param parent_candidates_percentage: percentage of parent candidates out of population_size
-        :param evaluation_function: function that receives a network and outputs its fitness
+        :param evaluation_function: function that receives a network and a seed and outputs its fitness, every network in
+                                    a generation gets the same seed so they can be evaluated on the same games
         :param log_folder: folder to upload log file to
         :param concurrency: number of concurrent processes to run
+        :param population_evaluation_function: function that receives a whole population and a seed and outputs the
+                                               fitness of each network, used instead of evaluation_function and the
+                                               process pool
+        :param shared_memory: whether the workers read the weights from, and write the fitnesses to, shared memory
+        :param chunk_size: number of networks each worker evaluates per task when using shared memory
+        :param checkpoint_path: .npz file the population generator is saved to after evaluating a generation
+        :param checkpoint_interval: number of generations between checkpoints
+        :param resume: whether to continue from the checkpoint at checkpoint_path, if it exists, up to 'generations', a
+                       checkpoint that already reached 'generations' is ignored with a warning
+        :param seed: seed of the whole run, the population's and the evaluations', random by default
+        :param racing_rounds: if set, a call of the evaluation function, or of population_evaluation_function, is a
+                              single round, and every generation is raced for up to this many rounds on the executor,
+                              networks that are clearly out of the survivors of crossover stop being evaluated early
+        :param executor: evaluates every generation instead of the executor the other parameters describe, such as a
+                         SocketExecutor with workers on other machines, it's closed when training ends
         """
         if log_folder is None:
             log_folder = os.path.curdir
 
+        population_generator = None
+        if resume and checkpoint_path is not None and os.path.exists(checkpoint_path):
+            population_generator = PopulationGenerator.load(checkpoint_path, generations)
+            if population_generator.generation >= generations:
+                warnings.warn(f'The checkpoint at {checkpoint_path} already finished {population_generator.generation} '
+                              f'of {generations} generations, starting a new run instead of resuming it')
+                population_generator = None
+
+        if population_generator is None:
+            population_generator = PopulationGenerator(generations, population_size, network_size, mutation_power,
+                                                       mutation_chance, offspring_percentage,
+                                                       parent_candidates_percentage, seed)
+
+        if executor is None:
+            executor = Trainer.get_executor(population_generator, evaluation_function, concurrency,
+                                            population_evaluation_function, shared_memory, chunk_size)
+        if racing_rounds is not None:
+            executor = RacingExecutor(executor, racing_rounds, population_generator.num_of_survivors)
+
         filename = f'{datetime.now().strftime("%d-%m-%y_%H:%M:%S")}.txt'
-        with open(os.path.join(log_folder, filename), 'w') as f:
-            with Pool(concurrency) as pool:
-                population_generator = PopulationGenerator(generations, population_size, network_size, mutation_power,
-                                                           mutation_chance, offspring_percentage, parent_candidates_percentage)
-                for population in population_generator:
-                    fitnesses = {network: pool.apply_async(evaluation_function, args=(network,))
-                                 for network in population}
-
-                    epoch = f'Epoch {population_generator.generation}/{population_generator.generations}'
-                    for network, fitness in tqdm(fitnesses.items(), desc=epoch):
-                        population[network] = fitness.get()
-
-                    network, fitness = max(population.items(), key=lambda pair: pair[1])
-                    f.write(f'epoch {population_generator.generation}:\n'
-                            f'   top fitness: {fitness}\n'
-                            f'   top weights: {network.weights}\n')
+        # the executor is entered first, so its workers and shared memory are released even if the log can't be opened
+        with executor, open(os.path.join(log_folder, filename), 'w') as f:
+            for population in population_generator:
+                epoch = f'Epoch {population_generator.generation}/{population_generator.generations}'
+                executor.evaluate(population, population_generator.evaluation_seed, epoch)
+                Trainer.log(f, population_generator)
+                if checkpoint_path is not None and population_generator.generation % checkpoint_interval == 0:
+                    population_generator.save(checkpoint_path)
+
+    @staticmethod
+    def get_executor(population_generator: PopulationGenerator, evaluation_function: EvaluationFunction,
+                     concurrency: int, population_evaluation_function: PopulationEvaluationFunction,
+                     shared_memory: bool, chunk_size: int) -> Executor:
+        """ Returns the executor described by the parameters of run, before racing. """
+        if population_evaluation_function is not None:
+            return LocalExecutor(population_evaluation_function)
+
+        if shared_memory:
+            shape = population_generator.population_size, population_generator.network_size
+            return SharedMemoryExecutor(evaluation_function, shape, concurrency, chunk_size)
+        return PoolExecutor(evaluation_function, concurrency)
+
+    @staticmethod
+    def log(f: TextIO, population_generator: PopulationGenerator) -> None:
+        """ Writes the top network of the current generation to the log file. """
+        population = population_generator.networks
+        network, fitness = max(population.items(), key=lambda pair: pair[1])
+        f.write(f'epoch {population_generator.generation}:\n'
+                f'   top fitness: {fitness}\n'
+                f'   top weights: {network.weights}\n')
@@ -0,0 +1,60 @@
+import argparse
+import socket
+import time
+
+import numpy as np
+
+from pytris.ai.network import Network
+from pytris.ai.protocol import CLOSE, HELLO, RESULT, TASK, Connection, import_function
+
+
+def connect(host: str, port: int, retry_interval: float, retries: int) -> socket.socket:
+    """ Connects to a SocketExecutor, retrying while it isn't listening yet. """
+    for attempt in range(retries + 1):
+        try:
+            return socket.create_connection((host, port))
+        except ConnectionRefusedError:
+            if attempt == retries:
+                raise
+            time.sleep(retry_interval)
+
+
+def run_worker(host: str, port: int, retry_interval: float = 1, retries: int = 30) -> int:
+    """
+    Evaluates the tasks a SocketExecutor sends until it closes the connection.
+    :param host: address of the executor
+    :param port: port of the executor
+    :param retry_interval: seconds between connection attempts
+    :param retries: number of connection attempts after the first one
+    :return: the number of evaluated networks
+    """
+    connection = Connection(connect(host, port, retry_interval, retries))
+    num_of_evaluations = 0
+    try:
+        message = connection.receive()
+        if message is None or message[0] != HELLO:
+            return num_of_evaluations
+
+        evaluation_function = import_function(message[1].decode())
+        while (message := connection.receive()) is not None and message[0] != CLOSE:
+            if message[0] == TASK:
+                seed, weights = Connection.parse_task(message[1])
+                fitnesses = np.array([evaluation_function(Network.from_weights(row), seed) for row in weights],
+                                     dtype=np.float64)
+                connection.send(RESULT, fitnesses.tobytes())
+                num_of_evaluations += len(weights)
+    finally:
+        connection.close()
+    return num_of_evaluations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Evaluates networks for a SocketExecutor.')
+    parser.add_argument('host', help='address of the executor')
+    parser.add_argument('port', type=int, help='port of the executor')
+    args = parser.parse_args()
+    run_worker(args.host, args.port)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,254 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import timeit
+from copy import copy
+from dataclasses import dataclass
+from functools import lru_cache
+from multiprocessing import get_context
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from pytris import Tetris
+from pytris.ai.algorithm import apply_move, generate_best_move, get_moves
+from pytris.ai.evaluator import evaluate_moves
+from pytris.ai.main import engine_evaluation, tetris_evaluation, vectorized_evaluation
+from pytris.ai.network import Network
+from pytris.ai.search import search_best_move
+from pytris.engine import Engine
+from pytris.tetromino_queue import TetrominoQueue
+from pytris.utils.vector import Vector
+
+SEED = 0
+# reference results shipped with the package, compared against by default when they're from the same machine
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks_baseline.json')
+# seconds every repeat is timed for at least, short timings are dominated by noise
+MIN_TIME = .2
+# the network the game's AI plays with
+NETWORK_WEIGHTS = (-0.7197158631719868, 0.593281303546271, -0.22543477397177927, -0.281434777249245)
+# number of AI moves played before the benchmarked position, so the stack isn't empty
+WARMUP_MOVES = 30
+
+
+@dataclass(frozen=True)
+class Benchmark:
+    """ A timed call, 'setup' receives the number of times the call is timed in a row, and returns the call. """
+    name: str
+    setup: Callable[[int], Callable[[], Any]]
+
+
+def get_network() -> Network:
+    return Network(Vector(NETWORK_WEIGHTS))
+
+
+@lru_cache(maxsize=None)
+def get_midgame(seed: int = SEED) -> Tetris:
+    """ Returns a game after the AI played WARMUP_MOVES moves in it, the same game for the same seed, it's shared. """
+    tetris = Tetris(10, 20, 0, seed)
+    network = get_network()
+    for _ in range(WARMUP_MOVES):
+        best_move, use_alt_move = generate_best_move(tetris, network)
+        if use_alt_move:
+            tetris.hold()
+        apply_move(tetris, best_move)
+    return tetris
+
+
+def copy_game(tetris: Tetris) -> Tetris:
+    """
+    Copies the parts of a game that locking and clearing change, which is far faster than deepcopy, so a benchmark can
+    change a copy on every call. The copies share their queue's random generator, which doesn't affect timings.
+    """
+    game = copy(tetris)
+    game.board = tetris.board.copy()
+    game.tetromino_queue = TetrominoQueue(SEED)
+    for tetromino in tetris.tetromino_queue:
+        game.tetromino_queue.insert(tetromino)
+    game.tetromino_queue.random = tetris.tetromino_queue.random
+    game.current_tetromino = copy(tetris.current_tetromino)
+    return game
+
+
+def setup_lock(number: int) -> Callable[[], Any]:
+    """ Locks a hard dropped tetromino into a separate copy of the midgame on every call. """
+    tetris = copy_game(get_midgame())
+    tetris.hard_drop()
+    games = [copy_game(tetris) for _ in range(number)]
+    return lambda: games.pop().lock()
+
+
+def setup_clear_rows(number: int) -> Callable[[], Any]:
+    """ Clears two full rows from a separate copy of the midgame on every call. """
+    tetris = copy_game(get_midgame())
+    for row in (tetris.board.height - 1, tetris.board.height - 3):
+        for col in range(tetris.board.width):
+            tetris.board.set(row, col, 'I')
+    games = [copy_game(tetris) for _ in range(number)]
+    return lambda: games.pop().clear_rows()
+
+
+def setup_movement(_: int) -> Callable[[], Any]:
+    tetris = get_midgame()
+    return lambda: (tetris.can_move_down, tetris.can_move_right, tetris.can_move_left)
+
+
+def setup_ghost_tetromino(_: int) -> Callable[[], Any]:
+    tetris = get_midgame()
+    return lambda: tetris.ghost_tetromino
+
+
+def setup_best_move(_: int) -> Callable[[], Any]:
+    tetris, network = get_midgame(), get_network()
+    return lambda: generate_best_move(tetris, network)
+
+
+def setup_beam_search(_: int) -> Callable[[], Any]:
+    """ Looks three tetrominoes ahead from the midgame, with the beam width the lookahead defaults to. """
+    tetris, network = get_midgame(), get_network()
+    return lambda: search_best_move(tetris, network, depth=3)
+
+
+def setup_moves_and_scores(_: int) -> Callable[[], Any]:
+    """ Generates every move of the current tetromino and scores the board after each of them. """
+    tetris, network = get_midgame(), get_network()
+    tetromino = tetris.current_tetromino
+    return lambda: evaluate_moves(tetris.board, tetromino.name, list(get_moves(tetris.board, tetromino)), network)
+
+
+def setup_engine_place(number: int) -> Callable[[], Any]:
+    """ Places a tetromino at the first placement of a fresh engine on every call. """
+    engines = [Engine(10, 20, SEED) for _ in range(number)]
+    placements = [engine.placements()[0] for engine in engines]
+    return lambda: engines.pop().place(*placements.pop())
+
+
+BENCHMARKS = (
+    Benchmark('tetris.lock', setup_lock),
+    Benchmark('tetris.clear_rows', setup_clear_rows),
+    Benchmark('tetris.movement', setup_movement),
+    Benchmark('tetris.ghost_tetromino', setup_ghost_tetromino),
+    Benchmark('tetris.to_json', lambda _: get_midgame().to_json),
+    Benchmark('ai.get_moves_and_scores', setup_moves_and_scores),
+    Benchmark('ai.generate_best_move', setup_best_move),
+    Benchmark('ai.beam_search', setup_beam_search),
+    Benchmark('ai.tetris_evaluation', lambda _: lambda: tetris_evaluation(get_network(), SEED)),
+    Benchmark('engine.place', setup_engine_place),
+    Benchmark('engine.engine_evaluation', lambda _: lambda: engine_evaluation(get_network(), SEED)),
+    Benchmark('engine.vectorized_evaluation', lambda _: lambda: vectorized_evaluation([get_network()] * 16, SEED)),
+)
+
+
+def time_calls(benchmark: Benchmark, number: int) -> float:
+    """ Returns the seconds 'number' calls take, timed with the garbage collector disabled like timeit does. """
+    return timeit.Timer(benchmark.setup(number)).timeit(number)
+
+
+def get_number(benchmark: Benchmark, min_time: float = MIN_TIME) -> int:
+    """ Returns the number of calls that take at least 'min_time', trying 1, 2, 5, 10, 20, ... like timeit's autorange. """
+    scale = 1
+    while True:
+        for multiplier in (1, 2, 5):
+            number = scale * multiplier
+            if time_calls(benchmark, number) >= min_time:
+                return number
+        scale *= 10
+
+
+def run_benchmark(benchmark: Benchmark, repeat: int) -> Tuple[int, List[float]]:
+    """ Returns the number of calls per repeat, and the seconds per call of every repeat, each at least MIN_TIME long. """
+    number = get_number(benchmark)
+    return number, [time_calls(benchmark, number) / number for _ in range(repeat)]
+
+
+def run_process_benchmarks(names: Optional[List[str]], repeat: int) -> Dict[str, Tuple[int, List[float]]]:
+    """ Runs the benchmarks whose names start with any of 'names', or all of them, in this process. """
+    return {benchmark.name: run_benchmark(benchmark, repeat) for benchmark in BENCHMARKS
+            if names is None or any(benchmark.name.startswith(name) for name in names)}
+
+
+def run_benchmarks(names: Optional[List[str]] = None, repeat: int = 3, processes: int = 3) -> Dict[str, Any]:
+    """
+    Runs the benchmarks whose names start with any of 'names', or all of them, in every one of 'processes' fresh
+    processes one after the other. Timings vary with how each process happened to lay out its memory, so the best
+    timing of several processes is far more stable than the best timing of one.
+    :return: the min, median and mean seconds per call across all repeats of every benchmark by name, and the machine
+             they ran on
+    """
+    timings: Dict[str, List[float]] = {}
+    numbers: Dict[str, int] = {}
+    for _ in range(processes):
+        with get_context('spawn').Pool(1) as pool:
+            for name, (number, process_timings) in pool.apply(run_process_benchmarks, (names, repeat)).items():
+                timings.setdefault(name, []).extend(process_timings)
+                numbers[name] = max(numbers.get(name, 0), number)
+
+    results = {name: {'min': min(values), 'median': statistics.median(values), 'mean': statistics.mean(values),
+                      'number': numbers[name], 'repeat': len(values)} for name, values in timings.items()}
+    return {'python': platform.python_version(), 'platform': platform.platform(), 'benchmarks': results}
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """ Returns the names of the benchmarks whose min time is more than 'tolerance' slower than the baseline's. """
+    regressions = []
+    for name, result in results['benchmarks'].items():
+        if name not in baseline['benchmarks']:
+            print(f'{name:32} {result["min"] * 1e6:12.1f}us   (no baseline)')
+            continue
+
+        ratio = result['min'] / baseline['benchmarks'][name]['min']
+        regressed = ratio > 1 + tolerance
+        if regressed:
+            regressions.append(name)
+        print(f'{name:32} {result["min"] * 1e6:12.1f}us   x{ratio:.2f}{"   REGRESSION" if regressed else ""}')
+    return regressions
+
+
+def load_baseline(path: Optional[str], results: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Returns the baseline at the given path, or the shipped reference results if no path is given and they were measured
+    on the same platform and Python as the results, timings from another machine can't be compared.
+    """
+    if path is not None:
+        with open(path, 'r') as f:
+            return json.load(f)
+
+    if not os.path.exists(BASELINE_PATH):
+        return None
+
+    with open(BASELINE_PATH, 'r') as f:
+        baseline = json.load(f)
+    if (baseline['python'], baseline['platform']) != (results['python'], results['platform']):
+        print(f'Not comparing to the reference results of Python {baseline["python"]} on {baseline["platform"]}')
+        return None
+    return baseline
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmarks the game and the AI hot paths.')
+    parser.add_argument('names', nargs='*', help='run only the benchmarks whose names start with these prefixes')
+    parser.add_argument('--repeat', type=int, default=3, help='number of timed repeats of every benchmark per process')
+    parser.add_argument('--processes', type=int, default=3, help='number of processes every benchmark runs in')
+    parser.add_argument('--output', help='JSON file to write the results to, usable as a baseline later')
+    parser.add_argument('--baseline',
+                        help='JSON file with the results of a previous run to compare to, by default the reference results '
+                             'shipped with the package, only if they were measured on the same platform and Python')
+    parser.add_argument('--tolerance', type=float, default=.25, help='allowed slowdown relative to the baseline')
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.names or None, args.repeat, args.processes)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    baseline = load_baseline(args.baseline, results)
+    if baseline is not None:
+        sys.exit(1 if compare(results, baseline, args.tolerance) else 0)
+
+    for name, result in results['benchmarks'].items():
+        print(f'{name:32} {result["min"] * 1e6:12.1f}us')
+
+
+if __name__ == '__main__':
+    main()
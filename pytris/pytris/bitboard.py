@@ -0,0 +1,254 @@
+from functools import lru_cache
+from random import Random
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from pytris.tetromino import NAMES, Shape
+
+# index 0 of the color plane is reserved for empty cells
+CELLS = (None, *NAMES)
+CODES = {cell: code for code, cell in enumerate(CELLS)}
+ZobristTable = Tuple[Tuple[Tuple[int, ...], ...], ...]
+
+
+@lru_cache(maxsize=None)
+def get_zobrist_table(width: int, height: int) -> ZobristTable:
+    """
+    Draws a random 64 bit key for every cell of a width x height board, and combines the keys of every 8 columns into
+    a table of all 256 occupancies, so hashing a row takes one lookup per byte of its mask.
+    The keys are seeded by the board size, so equal boards hash the same in every process.
+    """
+    random = Random(f'{width}x{height}')
+    zobrist_table = []
+    for _ in range(height):
+        row_table = []
+        for start in range(0, width, 8):
+            keys = [random.getrandbits(64) for _ in range(min(8, width - start))]
+            byte_table = [0] * (1 << len(keys))
+            for value in range(1, len(byte_table)):
+                lowest_bit = value & -value
+                byte_table[value] = byte_table[value ^ lowest_bit] ^ keys[lowest_bit.bit_length() - 1]
+            row_table.append(tuple(byte_table))
+        zobrist_table.append(tuple(row_table))
+    return tuple(zobrist_table)
+
+
+class BitRow:
+    """ A view of a single BitBoard row, so cells can be accessed as board[row][col]. """
+    __slots__ = ('board', 'row')
+
+    def __init__(self, board: 'BitBoard', row: int) -> None:
+        self.board = board
+        self.row = row
+
+    def __getitem__(self, col: int) -> Optional[str]:
+        return self.board.get(self.row, col)
+
+    def __setitem__(self, col: int, value: Optional[str]) -> None:
+        self.board.set(self.row, col, value)
+
+    def __iter__(self) -> Iterator[Optional[str]]:
+        start = self.row * self.board.width
+        return (CELLS[code] for code in self.board.colors[start:start + self.board.width])
+
+    def __len__(self) -> int:
+        return self.board.width
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+    def clear(self) -> None:
+        self.board.clear_row(self.row)
+
+
+class BitBoard:
+    def __init__(self, width: int, height: int) -> None:
+        """
+        A board that packs every row into an integer bitmask, bit i being set if column i is occupied.
+        The tetromino names are kept in a separate color plane, one byte per cell, which is only needed for rendering.
+        The Zobrist hash of which cells are occupied, regardless of their color, is computed on demand and memoized until
+        the board changes, so the game's own mutations don't pay for it and rows should only be changed through the
+        board's methods.
+        :param width: number of columns in the board
+        :param height: number of rows in the board
+        """
+        self.__width = width
+        self.__height = height
+        self.full_row = (1 << width) - 1
+        self.rows = [0] * height
+        self.colors = bytearray(width * height)
+        self.__hash: Optional[int] = 0
+        self.__zobrist_table = get_zobrist_table(width, height)
+
+    def __getitem__(self, row: int) -> BitRow:
+        if not -self.height <= row < self.height:
+            raise IndexError('board row index out of range')
+        return BitRow(self, row % self.height)
+
+    def __iter__(self) -> Iterator[BitRow]:
+        return (BitRow(self, row) for row in range(self.height))
+
+    def __len__(self) -> int:
+        return self.height
+
+    def __repr__(self) -> str:
+        return repr([list(row) for row in self])
+
+    def get(self, row: int, col: int) -> Optional[str]:
+        return CELLS[self.colors[row * self.width + col]]
+
+    def set(self, row: int, col: int, value: Optional[str]) -> None:
+        if value is None:
+            self.__set_row(row, self.rows[row] & ~(1 << col))
+        else:
+            self.__set_row(row, self.rows[row] | 1 << col)
+        self.colors[row * self.width + col] = CODES[value]
+
+    def row_hash(self, row: int, mask: int) -> int:
+        """ Returns the part of the hash contributed by the given row if its mask were 'mask'. """
+        row_hash = 0
+        for byte_table in self.__zobrist_table[row]:
+            row_hash ^= byte_table[mask & 0xff]
+            mask >>= 8
+        return row_hash
+
+    @property
+    def hash(self) -> int:
+        if self.__hash is None:
+            board_hash = 0
+            for row, mask in enumerate(self.rows):
+                if mask:
+                    board_hash ^= self.row_hash(row, mask)
+            self.__hash = board_hash
+        return self.__hash
+
+    def __set_row(self, row: int, mask: int) -> None:
+        self.rows[row] = mask
+        self.__hash = None
+
+    def is_occupied(self, row: int, col: int) -> bool:
+        """ Columns outside of the board are considered occupied. """
+        return not 0 <= col < self.width or self.rows[row] >> col & 1 == 1
+
+    def fits(self, shape: Shape, x: int, y: int) -> bool:
+        """ Returns whether the shape can be at (x, y) without overlapping blocks or walls, rows above the top are free. """
+        if x + shape.left < 0 or x + shape.right >= self.__width or y + shape.bottom >= self.__height:
+            return False
+
+        rows = self.rows
+        for j, mask in shape.row_masks:
+            if y + j >= 0 and rows[y + j] & (mask << x if x >= 0 else mask >> -x):
+                return False
+        return True
+
+    def drop_distance(self, shape: Shape, x: int, y: int) -> int:
+        """ Returns how many rows the shape can fall from (x, y), assuming it fits there. """
+        rows = self.rows
+        height = self.__height
+        distance = height - (y + shape.bottom + 1)
+        for i, j in shape.column_bottoms:
+            bit = 1 << (x + i)
+            start = y + j + 1
+            row = max(start, 0)
+            limit = min(height, start + distance)
+            while row < limit and not rows[row] & bit:
+                row += 1
+            distance = min(distance, row - start)
+        return distance
+
+    def placed_hash(self, shape: Shape, x: int, y: int) -> int:
+        """ Returns the hash the board would have with the shape placed at (x, y), without placing it. """
+        placed_hash = self.hash
+        for j, mask in shape.row_masks:
+            if y + j >= 0:
+                mask = mask << x if x >= 0 else mask >> -x
+                placed_hash ^= self.row_hash(y + j, self.rows[y + j]) ^ self.row_hash(y + j, self.rows[y + j] | mask)
+        return placed_hash
+
+    def is_empty(self, row: int) -> bool:
+        return self.rows[row] == 0
+
+    def is_full(self, row: int) -> bool:
+        return self.rows[row] == self.full_row
+
+    def clear_row(self, row: int) -> None:
+        self.__set_row(row, 0)
+        start = row * self.width
+        self.colors[start:start + self.width] = bytes(self.width)
+
+    def switch_rows(self, row1: int, row2: int) -> None:
+        mask1, mask2 = self.rows[row1], self.rows[row2]
+        self.__set_row(row1, mask2)
+        self.__set_row(row2, mask1)
+        start1, start2 = row1 * self.width, row2 * self.width
+        self.colors[start1:start1 + self.width], self.colors[start2:start2 + self.width] = \
+            self.colors[start2:start2 + self.width], self.colors[start1:start1 + self.width]
+
+    def place(self, rotation: Tuple[Tuple[int, int], ...], x: int, y: int, name: str) -> None:
+        """ Locks the given rotation into the board, blocks above the top row are ignored. """
+        code = CODES[name]
+        width = self.__width
+        rows = self.rows
+        for i, j in rotation:
+            if y + j >= 0:
+                rows[y + j] |= 1 << (x + i)
+                self.colors[(y + j) * width + x + i] = code
+        self.__hash = None
+
+    def clear_full_rows(self) -> List[int]:
+        """ Removes every full row and compacts the rows above it in a single pass, returns the cleared rows. """
+        full_row = self.full_row
+        cleared_rows = [row for row, mask in enumerate(self.rows) if mask == full_row]
+        if cleared_rows:
+            width = self.__width
+            # the runs of rows between cleared rows move down as whole slices, rows below the last cleared row stay put
+            runs = tuple(zip([-1] + cleared_rows, cleared_rows))
+            bottom = cleared_rows[-1] + 1
+            rows = [0] * len(cleared_rows)
+            for start, end in runs:
+                rows += self.rows[start + 1:end]
+            self.rows[:bottom] = rows
+            self.__hash = None
+            self.colors[:bottom * width] = bytes(len(cleared_rows) * width) + \
+                b''.join(self.colors[(start + 1) * width:end * width] for start, end in runs)
+        return cleared_rows
+
+    def remove(self, rotation: Tuple[Tuple[int, int], ...], x: int, y: int) -> None:
+        """ Removes the blocks of a previously placed rotation from the board. """
+        width = self.__width
+        for i, j in rotation:
+            if y + j >= 0:
+                self.__set_row(y + j, self.rows[y + j] & ~(1 << (x + i)))
+                self.colors[(y + j) * width + x + i] = 0
+
+    @property
+    def surface(self) -> int:
+        """ Returns the index of the highest row that has any blocks in it, or the height if the board is empty. """
+        return next((row for row, mask in enumerate(self.rows) if mask), self.__height)
+
+    @property
+    def full_rows(self) -> List[int]:
+        full_row = self.full_row
+        return [row for row, mask in enumerate(self.rows) if mask == full_row]
+
+    @property
+    def width(self) -> int:
+        return self.__width
+
+    @property
+    def height(self) -> int:
+        return self.__height
+
+    def copy(self) -> 'BitBoard':
+        copy = BitBoard(self.__width, self.__height)
+        copy.rows[:] = self.rows
+        copy.colors[:] = self.colors
+        copy.__hash = self.__hash
+        return copy
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            'width': self.width,
+            'height': self.height,
+            'cells': [[CELLS[code] for code in self.colors[start:start + self.width]]
+                      for start in range(0, self.width * self.height, self.width)],
+        }
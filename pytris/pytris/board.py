@@ -1,5 +1,6 @@
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
+from pytris.tetromino import Shape
 from pytris.utils.array import Array
 
 
@@ -9,15 +10,61 @@ class Board(Array[Array[Optional[str]]]):
         self.__width = width
         self.__height = height
 
+    def is_occupied(self, row: int, col: int) -> bool:
+        return self[row][col] is not None
+
+    def fits(self, shape: Shape, x: int, y: int) -> bool:
+        """ Returns whether the shape can be at (x, y) without overlapping blocks or walls, rows above the top are free. """
+        return all(0 <= x + i < self.width and y + j < self.height and (y + j < 0 or self[y + j][x + i] is None)
+                   for i, j in shape.rotation)
+
+    def drop_distance(self, shape: Shape, x: int, y: int) -> int:
+        """ Returns how many rows the shape can fall from (x, y), assuming it fits there. """
+        distance = 0
+        while self.fits(shape, x, y + distance + 1):
+            distance += 1
+        return distance
+
     def is_empty(self, row: int) -> bool:
         return all(cell is None for cell in self[row])
 
     def is_full(self, row: int) -> bool:
         return all(cell is not None for cell in self[row])
 
+    def clear_row(self, row: int) -> None:
+        self[row].clear()
+
     def switch_rows(self, row1: int, row2: int) -> None:
         self[row1], self[row2] = self[row2], self[row1]
 
+    def place(self, rotation: Tuple[Tuple[int, int], ...], x: int, y: int, name: str) -> None:
+        """ Locks the given rotation into the board, blocks above the top row are ignored. """
+        for i, j in rotation:
+            if y + j >= 0:
+                self[y + j][x + i] = name
+
+    def clear_full_rows(self) -> List[int]:
+        """ Removes every full row and compacts the rows above it in a single pass, returns the cleared rows. """
+        cleared_rows = self.full_rows
+        if cleared_rows:
+            kept_rows = [row for row in self if not all(cell is not None for cell in row)]
+            for row, cells in enumerate(kept_rows, len(cleared_rows)):
+                self[row] = cells
+            for row in range(len(cleared_rows)):
+                self[row] = Array(None for _ in range(self.width))
+        return cleared_rows
+
+    def remove(self, rotation: Tuple[Tuple[int, int], ...], x: int, y: int) -> None:
+        """ Removes the blocks of a previously placed rotation from the board. """
+        for i, j in rotation:
+            if y + j >= 0:
+                self[y + j][x + i] = None
+
+    @property
+    def surface(self) -> int:
+        """ Returns the index of the highest row that has any blocks in it, or the height if the board is empty. """
+        return next((row for row in range(self.height) if not self.is_empty(row)), self.height)
+
     @property
     def full_rows(self) -> List[int]:
         return [row for row in range(self.height) if self.is_full(row)]
@@ -30,6 +77,12 @@ class Board(Array[Array[Optional[str]]]):
     def height(self) -> int:
         return self.__height
 
+    def copy(self) -> 'Board':
+        copy = Board(self.width, self.height)
+        for row, cells in enumerate(self):
+            copy[row] = Array(cells)
+        return copy
+
     def to_json(self) -> Dict[str, Any]:
         return {
             'width': self.width,
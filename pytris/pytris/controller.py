@@ -1,18 +1,36 @@
 import time
 from functools import cached_property
-from typing import Dict
+from typing import Dict, Optional
 
 from pytris import Tetris
-from pytris.ai.algorithm import generate_best_move
+from pytris.ai.algorithm import apply_move
+from pytris.ai.cache import EvaluationCache
 from pytris.ai.network import Network
+from pytris.ai.search import search_best_move
+from pytris.profiler import Profiler
 from pytris.utils.vector import Vector
 
 
 class TetrisController:
-    def __init__(self, width: int, height: int, high_score_filepath: str) -> None:
+    def __init__(self, width: int, height: int, high_score_filepath: str, profile: bool = False, depth: int = 1,
+                 beam_width: int = 8, time_budget: Optional[float] = None) -> None:
+        """
+        :param width: number of columns in the board
+        :param height: number of rows in the board
+        :param high_score_filepath: file the high score is read from and saved to
+        :param profile: whether to time every phase of an update from the start, see 'profiler'
+        :param depth: number of tetrominoes the AI looks ahead through the queue, see search_best_move
+        :param beam_width: number of states the AI keeps after every tetromino it looks ahead
+        :param time_budget: seconds the AI may spend looking ahead on a move, or None for no limit
+        """
+        self.depth = depth
+        self.beam_width = beam_width
+        self.time_budget = time_budget
+        self.profiler = Profiler(profile)
         self.high_score_filepath = high_score_filepath
-        with open(high_score_filepath, 'r') as high_score:
-            self.__tetris = Tetris(width, height, int(high_score.read()))
+        with self.profiler.measure('file_io'), open(high_score_filepath, 'r') as f:
+            high_score = int(f.read())
+        self.__tetris = Tetris(width, height, high_score, profiler=self.profiler)
 
         self.__time_since_move_down = 0
         self.__time_since_cant_move_down = 0
@@ -34,22 +52,15 @@ class TetrisController:
 
     def ai(self) -> None:
         """ Lets the Algorithm generate the best move and does it. """
-        best_move, use_alt_move = generate_best_move(self.__tetris, self.network)
+        with self.profiler.measure('ai_decision'):
+            best_move, use_alt_move = search_best_move(self.__tetris, self.network, self.depth, self.beam_width,
+                                                       self.time_budget, self.evaluation_cache)
 
         if use_alt_move:
             self.__tetris.hold()
 
-        for _ in range(best_move.rotation):
-            self.__tetris.rotate_right()
-
-        for _ in range(best_move.right):
-            self.__tetris.move_right()
-
-        for _ in range(best_move.left):
-            self.__tetris.move_left()
-
-        self.__tetris.hard_drop()
-        self.__tetris.lock()
+        with self.profiler.measure('lock'):
+            apply_move(self.__tetris, best_move)
 
     def player(self) -> None:
         """ Controls movement cooldowns for the player. """
@@ -83,25 +94,27 @@ class TetrisController:
                 self.__time_since_cant_move_down = now
             elif not (self.__tetris.can_move_right or self.__tetris.can_move_left) \
                     or now - self.__time_since_cant_move_down > self.lock_delay:
-                self.__tetris.lock()
+                with self.profiler.measure('lock'):
+                    self.__tetris.lock()
                 self.__time_since_cant_move_down = 0
 
     def update_high_score(self) -> None:
         if self.__tetris.score > self.__tetris.high_score:
             self.__tetris.high_score = self.__tetris.score
 
-        with open(self.high_score_filepath, 'w') as f:
+        with self.profiler.measure('file_io'), open(self.high_score_filepath, 'w') as f:
             f.write(str(self.__tetris.high_score))
 
     def update(self) -> None:
-        if self.__tetris.terminal or self.paused:
-            self.update_high_score()
-            return
+        with self.profiler.measure('update'):
+            if self.__tetris.terminal or self.paused:
+                self.update_high_score()
+                return
 
-        if self.use_ai:
-            self.ai()
-        else:
-            self.player()
+            if self.use_ai:
+                self.ai()
+            else:
+                self.player()
 
     def start_move_right(self) -> None:
         self.__move_right = True
@@ -192,5 +205,16 @@ class TetrisController:
         """ The best network found during training. """
         return Network(Vector((-0.7197158631719868, 0.593281303546271, -0.22543477397177927, -0.281434777249245)))
 
+    @cached_property
+    def evaluation_cache(self) -> EvaluationCache:
+        """ Evaluations of boards by the network, reused across moves. """
+        return EvaluationCache()
+
     def to_json(self) -> Dict:
-        return self.__tetris.to_json()
+        with self.profiler.measure('to_json'):
+            return self.__tetris.to_json()
+
+    def diff(self, version: int = 0) -> Dict:
+        """ Returns what changed in the game since the given version, see Tetris.diff. """
+        with self.profiler.measure('diff'):
+            return self.__tetris.diff(version)
@@ -0,0 +1,186 @@
+from collections import deque
+from functools import lru_cache
+from random import Random
+from typing import Deque, Dict, List, Optional, Tuple
+
+from pytris.tetris import HARD_DROP_SCORE, SPAWN_Y, get_level, get_line_clear_score
+from pytris.tetromino import NAMES, SHAPES
+
+
+def get_unique_rotations(name: str) -> Tuple[int, ...]:
+    """ Returns the rotation indices whose blocks differ from all previous rotations up to a translation. """
+    unique_rotations = {}
+    for index, shape in enumerate(SHAPES[name]):
+        normalized = frozenset((i - shape.left, j - shape.top) for i, j in shape.rotation)
+        unique_rotations.setdefault(normalized, index)
+    return tuple(unique_rotations.values())
+
+
+# dropped straight down from above the stack, rotations that only differ by a translation land on the same blocks
+UNIQUE_ROTATIONS: Dict[str, Tuple[int, ...]] = {name: get_unique_rotations(name) for name in NAMES}
+# the row masks shifted to the placement's column, and the (column, top, bottom) of every occupied column
+Placement = Tuple[Tuple[Tuple[int, int], ...], Tuple[Tuple[int, int, int], ...]]
+PlacementTable = Dict[str, Tuple[Dict[int, Placement], ...]]
+
+
+@lru_cache(maxsize=None)
+def get_placement_table(width: int) -> PlacementTable:
+    """ Precomputes every in bounds placement of every rotation of every tetromino, on a board of the given width. """
+    placement_table = {}
+    for name, shapes in SHAPES.items():
+        placement_table[name] = tuple(
+            {x: (tuple((j, mask << x if x >= 0 else mask >> -x) for j, mask in shape.row_masks),
+                 tuple((x + i, top, bottom)
+                       for (i, top), (_, bottom) in zip(shape.column_tops, shape.column_bottoms)))
+             for x in range(-shape.left, width - shape.right)}
+            for shape in shapes)
+    return placement_table
+
+
+class Engine:
+    __slots__ = ('width', 'height', 'full_row', 'placement_table', 'rows', 'tops', 'random', 'tetromino_queue',
+                 'current_tetromino', 'held_tetromino', 'can_hold', 'cleared_lines', 'score', 'terminal')
+
+    def __init__(self, width: int = 10, height: int = 20, seed: Optional[int] = None) -> None:
+        """
+        A headless game for simulations. Tetrominoes are placed by rotation and column and hard dropped straight down
+        onto the stack, skipping step by step movement, ActiveTetromino objects and to_json entirely.
+        :param width: number of columns in the board
+        :param height: number of rows in the board
+        :param seed: seed of the random generator that shuffles this game's bags
+        """
+        self.width = width
+        self.height = height
+        self.full_row = (1 << width) - 1
+        self.placement_table = get_placement_table(width)
+        self.reset(seed)
+
+    def reset(self, seed: Optional[int] = None) -> None:
+        self.rows = [0] * self.height
+        # the highest occupied row of every column, or the height if the column is empty
+        self.tops = [self.height] * self.width
+        self.random = Random(seed)
+        self.tetromino_queue: Deque[str] = deque()
+        self.update_queue()
+        self.current_tetromino = self.tetromino_queue.popleft()
+        self.held_tetromino = None
+        self.can_hold = True
+        self.cleared_lines = 0
+        self.score = 0
+        self.terminal = False
+
+    def update_queue(self) -> None:
+        bag = NAMES.copy()
+        self.random.shuffle(bag)
+        self.tetromino_queue.extend(bag)
+
+    def placements(self, name: Optional[str] = None) -> List[Tuple[int, int]]:
+        """ Returns every (rotation, x) of the tetromino, current by default, that lands on a distinct set of blocks. """
+        name = name or self.current_tetromino
+        return [(rotation, x) for rotation in UNIQUE_ROTATIONS[name] for x in self.placement_table[name][rotation]]
+
+    def landing_y(self, rotation: int, x: int, name: Optional[str] = None) -> int:
+        """ Returns the y the tetromino, current by default, lands at when it's dropped from above the stack. """
+        _, columns = self.placement_table[name or self.current_tetromino][rotation][x]
+        return min(self.tops[col] - bottom for col, _, bottom in columns) - 1
+
+    def place(self, rotation: int, x: int) -> Tuple[int, bool]:
+        """
+        Drops the current tetromino at the given rotation and column, locks it and spawns the next tetromino.
+        :return: the number of cleared lines, and whether the game is over
+        """
+        if self.terminal:
+            raise ValueError('Can\'t place a tetromino after the game is over')
+
+        try:
+            row_masks, columns = self.placement_table[self.current_tetromino][rotation][x]
+        except (IndexError, KeyError):
+            raise ValueError(f'Rotation {rotation} of {self.current_tetromino} doesn\'t fit at x={x}')
+
+        y = self.__drop_y(columns)
+        cleared_rows = self.__lock(row_masks, columns, y)
+        self.score += HARD_DROP_SCORE * (y - SPAWN_Y)
+        if cleared_rows:
+            self.clear_rows(cleared_rows)
+
+        self.__spawn()
+        self.terminal = self.terminal or self.rows[0] != 0
+        return len(cleared_rows), self.terminal
+
+    def __drop_y(self, columns: Tuple[Tuple[int, int, int], ...]) -> int:
+        """ Returns the y a placement with the given occupied columns lands at. """
+        tops = self.tops
+        y = self.height
+        for col, _, bottom in columns:
+            if tops[col] - bottom < y:
+                y = tops[col] - bottom
+        return y - 1
+
+    def __lock(self, row_masks: Tuple[Tuple[int, int], ...], columns: Tuple[Tuple[int, int, int], ...],
+               y: int) -> List[int]:
+        """ Locks a placement's rows at y into the stack and updates the column tops, returns the full rows. """
+        rows, tops = self.rows, self.tops
+        full_rows = []
+        for j, mask in row_masks:
+            if y + j < 0:
+                # the tetromino locked above the top of the board
+                self.terminal = True
+                continue
+
+            rows[y + j] |= mask
+            if rows[y + j] == self.full_row:
+                full_rows.append(y + j)
+        for col, top, bottom in columns:
+            if y + bottom >= 0 and y + top < tops[col]:
+                tops[col] = max(y + top, 0)
+        return full_rows
+
+    def __spawn(self) -> None:
+        if len(self.tetromino_queue) <= len(NAMES):
+            self.update_queue()
+        self.current_tetromino = self.tetromino_queue.popleft()
+        self.can_hold = True
+
+    def clear_rows(self, cleared_rows: List[int]) -> None:
+        """ Removes the given full rows, in ascending order, and compacts the stack above them. """
+        rows = self.rows
+        bottom = cleared_rows[-1] + 1
+        rows[:bottom] = [0] * len(cleared_rows) + [mask for mask in rows[:bottom] if mask != self.full_row]
+
+        tops = self.tops = [self.height] * self.width
+        found = 0
+        for row, mask in enumerate(rows):
+            new = mask & ~found
+            while new:
+                lowest_bit = new & -new
+                tops[lowest_bit.bit_length() - 1] = row
+                new ^= lowest_bit
+            found |= mask
+            if found == self.full_row:
+                break
+
+        self.score += get_line_clear_score(len(cleared_rows), self.cleared_lines)
+        self.cleared_lines += len(cleared_rows)
+
+    def hold(self) -> bool:
+        """ Swaps the current tetromino with the held one, returns whether holding was allowed. """
+        if not self.can_hold:
+            return False
+
+        if self.held_tetromino is None:
+            self.held_tetromino, self.current_tetromino = self.current_tetromino, self.tetromino_queue.popleft()
+        else:
+            self.held_tetromino, self.current_tetromino = self.current_tetromino, self.held_tetromino
+        self.can_hold = False
+        return True
+
+    @property
+    def alternative_tetromino(self) -> Optional[str]:
+        """ Returns the tetromino that holding would make current, or None if holding isn't allowed. """
+        if not self.can_hold:
+            return None
+        return self.held_tetromino if self.held_tetromino is not None else self.tetromino_queue[0]
+
+    @property
+    def level(self) -> int:
+        return get_level(self.cleared_lines)
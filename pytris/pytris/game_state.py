@@ -0,0 +1,96 @@
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from pytris.active_tetromino import ActiveTetromino
+from pytris.bitboard import BitBoard
+from pytris.tetris import HARD_DROP_SCORE, SPAWN_X, SPAWN_Y, Tetris, get_level, get_line_clear_score
+from pytris.tetromino import ROTATIONS, Tetromino
+
+
+@dataclass(frozen=True)
+class GameState:
+    """
+    An immutable snapshot of a game, which search code can branch from without touching the live Tetris.
+    Every transition returns a new GameState, the board of a state is never mutated once it is created.
+    Only the visible queue is known, so a state whose queue ran out has no current tetromino.
+    """
+    board: BitBoard
+    current_tetromino: Optional[str]
+    held_tetromino: Optional[str]
+    can_hold: bool
+    tetromino_queue: Tuple[str, ...]
+    score: int
+    cleared_lines: int
+    x: int = SPAWN_X
+    y: int = SPAWN_Y
+    rotation_index: int = 0
+
+    @classmethod
+    def from_tetris(cls, tetris: Tetris) -> 'GameState':
+        return cls(board=tetris.board.copy(),
+                   current_tetromino=tetris.current_tetromino.name,
+                   held_tetromino=tetris.held_tetromino.name if tetris.held_tetromino else None,
+                   can_hold=tetris.can_hold,
+                   tetromino_queue=tuple(tetromino.name for tetromino in tetris.tetromino_queue),
+                   score=tetris.score,
+                   cleared_lines=tetris.cleared_lines,
+                   x=tetris.current_tetromino.x,
+                   y=tetris.current_tetromino.y,
+                   rotation_index=tetris.current_tetromino.rotation_index)
+
+    @property
+    def active_tetromino(self) -> Optional[ActiveTetromino]:
+        """ Returns a fresh ActiveTetromino at the current tetromino's position. """
+        if self.current_tetromino is None:
+            return None
+
+        tetromino = ActiveTetromino.from_tetromino(Tetromino(self.current_tetromino), self.x, self.y)
+        tetromino.rotation_index = self.rotation_index
+        return tetromino
+
+    def hold(self) -> Optional['GameState']:
+        """ Returns the state after holding the current tetromino, or None if holding isn't allowed. """
+        if not self.can_hold or self.current_tetromino is None:
+            return None
+
+        if self.held_tetromino is None:
+            if not self.tetromino_queue:
+                return None
+            current_tetromino, tetromino_queue = self.tetromino_queue[0], self.tetromino_queue[1:]
+        else:
+            current_tetromino, tetromino_queue = self.held_tetromino, self.tetromino_queue
+
+        return GameState(board=self.board,
+                         current_tetromino=current_tetromino,
+                         held_tetromino=self.current_tetromino,
+                         can_hold=False,
+                         tetromino_queue=tetromino_queue,
+                         score=self.score,
+                         cleared_lines=self.cleared_lines)
+
+    def place(self, rotation_index: int, x: int, y: int) -> 'GameState':
+        """ Returns the state after locking the current tetromino at (x, y) and clearing the full rows. """
+        board = self.board.copy()
+        board.place(ROTATIONS[self.current_tetromino][rotation_index], x, y, self.current_tetromino)
+        cleared_rows = board.clear_full_rows()
+
+        score = self.score + HARD_DROP_SCORE * max(y - self.y, 0)
+        if cleared_rows:
+            score += get_line_clear_score(len(cleared_rows), self.cleared_lines)
+
+        return GameState(board=board,
+                         current_tetromino=self.tetromino_queue[0] if self.tetromino_queue else None,
+                         held_tetromino=self.held_tetromino,
+                         can_hold=True,
+                         tetromino_queue=self.tetromino_queue[1:],
+                         score=score,
+                         cleared_lines=self.cleared_lines + len(cleared_rows))
+
+    @property
+    def level(self) -> int:
+        return get_level(self.cleared_lines)
+
+    @property
+    def terminal(self) -> bool:
+        """ If the top row has any locked blocks in it, the game is over. """
+        return not self.board.is_empty(0)
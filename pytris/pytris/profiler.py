@@ -0,0 +1,133 @@
+import json
+import time
+from bisect import bisect_right
+from contextlib import nullcontext
+from typing import Any, ContextManager, Dict, List, Optional
+
+# upper edges of the histogram buckets, in seconds, from 1µs doubling up to about 1s, the last bucket is unbounded
+BUCKET_EDGES = tuple(1e-6 * 2 ** i for i in range(21))
+BUCKET_LABELS = tuple(f'<{edge * 1e6:g}us' for edge in BUCKET_EDGES) + (f'>={BUCKET_EDGES[-1] * 1e6:g}us',)
+
+
+class PhaseStats:
+    __slots__ = ('count', 'total', 'min', 'max', 'histogram')
+
+    def __init__(self) -> None:
+        """ Counters and a log scale histogram of the durations of one phase. """
+        self.count = 0
+        self.total = 0.
+        self.min = float('inf')
+        self.max = 0.
+        self.histogram = [0] * (len(BUCKET_EDGES) + 1)
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        if seconds < self.min:
+            self.min = seconds
+        if seconds > self.max:
+            self.max = seconds
+        self.histogram[bisect_right(BUCKET_EDGES, seconds)] += 1
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.
+
+    def percentile(self, q: float) -> float:
+        """ Returns the upper edge of the bucket the q-th percentile falls in, capped by the max, an upper bound of it. """
+        rank = q / 100 * self.count
+        seen = 0
+        for index, count in enumerate(self.histogram):
+            seen += count
+            if count and seen >= rank:
+                return min(BUCKET_EDGES[index], self.max) if index < len(BUCKET_EDGES) else self.max
+        return 0.
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            'count': self.count,
+            'total': self.total,
+            'mean': self.mean,
+            'min': self.min if self.count else 0.,
+            'max': self.max,
+            'p50': self.percentile(50),
+            'p99': self.percentile(99),
+            'histogram': {label: count for label, count in zip(BUCKET_LABELS, self.histogram) if count},
+        }
+
+
+class Measurement:
+    __slots__ = ('profiler', 'phase', 'start')
+
+    def __init__(self, profiler: 'Profiler', phase: str) -> None:
+        self.profiler = profiler
+        self.phase = phase
+        self.start = 0.
+
+    def __enter__(self) -> 'Measurement':
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.profiler.record(self.phase, time.perf_counter() - self.start)
+
+
+class Profiler:
+    def __init__(self, enabled: bool = False) -> None:
+        """
+        Per phase timing counters and histograms. While disabled, measure returns a shared no-op context manager,
+        so instrumented code costs a method call and nothing is recorded.
+        :param enabled: whether to record measurements from the start
+        """
+        self.enabled = enabled
+        self.__stats: Dict[str, PhaseStats] = {}
+        self.__null_measurement = nullcontext()
+
+    def measure(self, phase: str) -> ContextManager:
+        """ Returns a context manager that records the duration of its block under 'phase', if enabled. """
+        if not self.enabled:
+            return self.__null_measurement
+        return Measurement(self, phase)
+
+    def record(self, phase: str, seconds: float) -> None:
+        stats = self.__stats.get(phase)
+        if stats is None:
+            stats = self.__stats[phase] = PhaseStats()
+        stats.add(seconds)
+
+    def enable(self) -> None:
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def reset(self) -> None:
+        self.__stats.clear()
+
+    def stats(self, phase: str) -> Optional[PhaseStats]:
+        """ Returns the stats of a phase, or None if it wasn't measured yet. """
+        return self.__stats.get(phase)
+
+    @property
+    def phases(self) -> List[str]:
+        return list(self.__stats)
+
+    def to_json(self) -> Dict[str, Dict[str, Any]]:
+        return {phase: stats.to_json() for phase, stats in self.__stats.items()}
+
+    def dump(self, path: str) -> None:
+        """ Writes the stats of every phase to a JSON file. """
+        with open(path, 'w') as f:
+            json.dump(self.to_json(), f, indent=2)
+
+    def __str__(self) -> str:
+        lines = [f'{"phase":16}{"count":>8}{"mean":>12}{"p50":>12}{"p99":>12}{"max":>12}']
+        for phase, stats in self.__stats.items():
+            lines.append(f'{phase:16}{stats.count:>8}' + ''.join(
+                f'{seconds * 1e6:>10.1f}us' for seconds in (stats.mean, stats.percentile(50), stats.percentile(99),
+                                                            stats.max)))
+        return '\n'.join(lines)
+
+
+# used by code that can be profiled but wasn't given a profiler
+NULL_PROFILER = Profiler()
@@ -0,0 +1,36 @@
+from typing import Dict, Hashable
+
+# fingerprint of keys that were never recorded, unequal to every real fingerprint
+MISSING = object()
+
+
+class StateTracker:
+    def __init__(self) -> None:
+        """
+        Versions the parts of a state by fingerprint, so a reader that saw version v can ask which parts changed since.
+        The version only grows, every commit that follows at least one change increments it.
+        """
+        self.version = 0
+        self.__fingerprints: Dict[Hashable, Hashable] = {}
+        self.__versions: Dict[Hashable, int] = {}
+        self.__dirty = False
+
+    def update(self, key: Hashable, fingerprint: Hashable) -> bool:
+        """ Records the fingerprint of a part, returns whether it changed, a change belongs to the next version. """
+        if self.__fingerprints.get(key, MISSING) == fingerprint:
+            return False
+
+        self.__fingerprints[key] = fingerprint
+        self.__versions[key] = self.version + 1
+        self.__dirty = True
+        return True
+
+    def commit(self) -> int:
+        """ Closes the current version if anything changed, returns the latest version. """
+        if self.__dirty:
+            self.version += 1
+            self.__dirty = False
+        return self.version
+
+    def changed_since(self, key: Hashable, version: int) -> bool:
+        return self.__versions.get(key, 0) > version
@@ -1,21 +1,42 @@
-from typing import Any, Dict, Tuple
+from typing import Any, Dict, List, Optional
 
 from pytris.active_tetromino import ActiveTetromino
-from pytris.board import Board
-from pytris.tetromino import NAMES, Tetromino
+from pytris.bitboard import BitBoard
+from pytris.profiler import NULL_PROFILER, Profiler
+from pytris.state_tracker import StateTracker
+from pytris.tetromino import NAMES, Shape, Tetromino
 from pytris.tetromino_queue import TetrominoQueue
 
 LINE_CLEAR_SCORE = (100, 300, 500, 800)
 SOFT_DROP_SCORE = 1
 HARD_DROP_SCORE = 2
+SPAWN_X = 3
+SPAWN_Y = -4
+
+
+def get_level(cleared_lines: int) -> int:
+    """ Returns the level of a game with 'cleared_lines' cleared lines, max is 20. """
+    return min(cleared_lines // 10 + 1, 20)
+
+
+def get_line_clear_score(num_of_rows: int, cleared_lines: int) -> int:
+    """
+    Returns the score of clearing 'num_of_rows' rows at once, in a game that cleared 'cleared_lines' lines before them.
+    The clear is scored at the level the game reaches with it, every game implementation scores through this.
+    """
+    return LINE_CLEAR_SCORE[num_of_rows - 1] * get_level(cleared_lines + num_of_rows)
 
 
 class Tetris:
-    def __init__(self, width: int, height: int, high_score: int) -> None:
-        self.board = Board(width, height)
-        self.tetromino_queue = TetrominoQueue()
+    def __init__(self, width: int, height: int, high_score: int, seed: Optional[int] = None,
+                 profiler: Profiler = NULL_PROFILER, state_tracker: Optional[StateTracker] = None) -> None:
+        self.profiler = profiler
+        # kept across resets, so versions keep growing and readers see a reset as a change
+        self.state_tracker = state_tracker or StateTracker()
+        self.board = BitBoard(width, height)
+        self.tetromino_queue = TetrominoQueue(seed)
         self.tetromino_queue.update()
-        self.current_tetromino = ActiveTetromino.from_tetromino(self.tetromino_queue.pop(), 3, -4)
+        self.current_tetromino = ActiveTetromino.from_tetromino(self.tetromino_queue.pop(), SPAWN_X, SPAWN_Y)
 
         self.held_tetromino = None
         self.can_hold = True
@@ -24,38 +45,27 @@ class Tetris:
         self.score = 0
         self.high_score = high_score
 
-    def lock(self) -> None:
+    def lock(self) -> List[int]:
+        """ Locks the current tetromino into the board and spawns the next one, returns the cleared rows. """
         if len(self.tetromino_queue) <= len(NAMES):
             self.tetromino_queue.update()
 
-        for i, j in self.current_tetromino.rotation:
-            if self.current_tetromino.y + j >= 0:
-                self.board[self.current_tetromino.y + j][self.current_tetromino.x + i] = self.current_tetromino.name
-        self.clear_rows()
+        self.board.place(self.current_tetromino.rotation, self.current_tetromino.x, self.current_tetromino.y,
+                         self.current_tetromino.name)
+        with self.profiler.measure('clear'):
+            cleared_rows = self.clear_rows()
 
-        self.current_tetromino = ActiveTetromino.from_tetromino(self.tetromino_queue.pop(), 3, -4)
+        self.current_tetromino = ActiveTetromino.from_tetromino(self.tetromino_queue.pop(), SPAWN_X, SPAWN_Y)
 
         self.can_hold = True
+        return cleared_rows
 
-    def drop_rows(self, last_row: int) -> None:
-        for row in range(last_row - 1, 0, -1):
-            if self.board.is_empty(row):
-                continue
-
-            cur_row = row
-            while cur_row + 1 < self.board.height and self.board.is_empty(cur_row + 1):
-                self.board.switch_rows(cur_row, cur_row + 1)
-                cur_row += 1
-
-    def clear_rows(self) -> None:
-        if cleared_rows := self.board.full_rows:
-            for row in cleared_rows:
-                self.board[row].clear()
-
+    def clear_rows(self) -> List[int]:
+        """ Clears all full rows and drops the rest of the stack in a single pass, returns the cleared rows. """
+        if cleared_rows := self.board.clear_full_rows():
+            self.score += get_line_clear_score(len(cleared_rows), self.cleared_lines)
             self.cleared_lines += len(cleared_rows)
-            self.score += LINE_CLEAR_SCORE[len(cleared_rows) - 1] * self.level
-
-            self.drop_rows(cleared_rows[-1])
+        return cleared_rows
 
     def move_down(self) -> None:
         if self.can_move_down:
@@ -70,16 +80,18 @@ class Tetris:
             self.current_tetromino.x -= 1
 
     def rotate_right(self) -> None:
+        shape = self.current_tetromino.right_shape
         for x_offset, y_offset in self.current_tetromino.right_rotation_offsets:
-            if self.can_rotate(self.current_tetromino.right_rotation, x_offset, y_offset):
+            if self.can_rotate(shape, x_offset, y_offset):
                 self.current_tetromino.rotate_right()
                 self.current_tetromino.x += x_offset
                 self.current_tetromino.y += y_offset
                 break
 
     def rotate_left(self) -> None:
+        shape = self.current_tetromino.left_shape
         for x_offset, y_offset in self.current_tetromino.left_rotation_offsets:
-            if self.can_rotate(self.current_tetromino.left_rotation, x_offset, y_offset):
+            if self.can_rotate(shape, x_offset, y_offset):
                 self.current_tetromino.rotate_left()
                 self.current_tetromino.x += x_offset
                 self.current_tetromino.y += y_offset
@@ -91,9 +103,9 @@ class Tetris:
             self.score += SOFT_DROP_SCORE
 
     def hard_drop(self) -> None:
-        while self.can_move_down:
-            self.current_tetromino.y += 1
-            self.score += HARD_DROP_SCORE
+        distance = self.board.drop_distance(self.current_tetromino.shape, self.current_tetromino.x, self.current_tetromino.y)
+        self.current_tetromino.y += distance
+        self.score += HARD_DROP_SCORE * distance
 
     def hold(self) -> None:
         if self.can_hold:
@@ -103,7 +115,7 @@ class Tetris:
                 new_tetromino = self.held_tetromino
 
             self.held_tetromino = Tetromino(self.current_tetromino.name)
-            self.current_tetromino = ActiveTetromino.from_tetromino(new_tetromino, 3, -4)
+            self.current_tetromino = ActiveTetromino.from_tetromino(new_tetromino, SPAWN_X, SPAWN_Y)
             self.can_hold = False
 
     def unhold(self) -> None:
@@ -112,36 +124,26 @@ class Tetris:
 
         new_tetromino = self.held_tetromino
         self.held_tetromino = Tetromino(self.current_tetromino.name)
-        self.current_tetromino = ActiveTetromino.from_tetromino(new_tetromino, 3, -4)
+        self.current_tetromino = ActiveTetromino.from_tetromino(new_tetromino, SPAWN_X, SPAWN_Y)
         self.can_hold = True
 
-    def reset(self) -> None:
-        self.__init__(self.board.width, self.board.height, self.high_score)
+    def reset(self, seed: Optional[int] = None) -> None:
+        self.__init__(self.board.width, self.board.height, self.high_score, seed, self.profiler, self.state_tracker)
 
     @property
     def can_move_down(self) -> bool:
-        return self.current_tetromino.bottom < 0 or \
-               (self.current_tetromino.bottom + 1 < self.board.height and
-                all(self.board[self.current_tetromino.y + j + 1][self.current_tetromino.x + i] is None
-                    for i, j in self.current_tetromino.rotation if self.current_tetromino.y + j >= 0))
+        return self.board.fits(self.current_tetromino.shape, self.current_tetromino.x, self.current_tetromino.y + 1)
 
     @property
     def can_move_right(self) -> bool:
-        return self.current_tetromino.right + 1 < self.board.width and \
-               all(self.board[self.current_tetromino.y + j][self.current_tetromino.x + i + 1] is None
-                   for i, j in self.current_tetromino.rotation if self.current_tetromino.y + j >= 0)
+        return self.board.fits(self.current_tetromino.shape, self.current_tetromino.x + 1, self.current_tetromino.y)
 
     @property
     def can_move_left(self) -> bool:
-        return self.current_tetromino.left > 0 and \
-               all(self.board[self.current_tetromino.y + j][self.current_tetromino.x + i - 1] is None
-                   for i, j in self.current_tetromino.rotation if self.current_tetromino.y + j >= 0)
+        return self.board.fits(self.current_tetromino.shape, self.current_tetromino.x - 1, self.current_tetromino.y)
 
-    def can_rotate(self, rotation: Tuple[Tuple[int, int], ...], x_offset: int, y_offset: int) -> bool:
-        return all(self.current_tetromino.y + j + y_offset < self.board.height and
-                   0 < self.current_tetromino.x + i + x_offset < self.board.width and
-                   self.board[self.current_tetromino.y + j + y_offset][self.current_tetromino.x + i + x_offset] is None
-                   for i, j in rotation if self.current_tetromino.y + j >= 0)
+    def can_rotate(self, shape: Shape, x_offset: int, y_offset: int) -> bool:
+        return self.board.fits(shape, self.current_tetromino.x + x_offset, self.current_tetromino.y + y_offset)
 
     @property
     def terminal(self) -> bool:
@@ -151,33 +153,83 @@ class Tetris:
     @property
     def level(self) -> int:
         """ Returns the current level of the game, max is 20. """
-        return min(self.cleared_lines // 10 + 1, 20)
+        return get_level(self.cleared_lines)
 
     @property
     def ghost_tetromino(self) -> ActiveTetromino:
         ghost_tetromino = self.current_tetromino.copy()
-        while ghost_tetromino.bottom + 1 < self.board.height and \
-                all(self.board[ghost_tetromino.y + j + 1][ghost_tetromino.x + i] is None
-                    for i, j in ghost_tetromino.rotation if ghost_tetromino.y + j >= 0):
-            ghost_tetromino.y += 1
+        ghost_tetromino.y += self.board.drop_distance(ghost_tetromino.shape, ghost_tetromino.x, ghost_tetromino.y)
         return ghost_tetromino
 
+    def sync(self) -> int:
+        """ Records which parts of the game changed since the last sync under a new version, returns the version. """
+        tracker = self.state_tracker
+        current_tetromino = self.current_tetromino
+        tracker.update('current_tetromino',
+                       (current_tetromino.name, current_tetromino.rotation_index, current_tetromino.x, current_tetromino.y))
+        tracker.update('held_tetromino', self.held_tetromino.name if self.held_tetromino else None)
+        tracker.update('tetromino_queue', tuple(tetromino.name for tetromino in self.tetromino_queue))
+        tracker.update('stats', (self.cleared_lines, self.level, self.score, self.high_score))
+        # the board is compared by content, occupancy and colors, and rows are only compared when it changed
+        rows, colors, width = self.board.rows, self.board.colors, self.board.width
+        if tracker.update('board', (tuple(rows), bytes(colors))):
+            for row in range(self.board.height):
+                tracker.update(('row', row), (rows[row], bytes(colors[row * width:(row + 1) * width])))
+        return tracker.commit()
+
+    def diff(self, version: int = 0) -> Dict[str, Any]:
+        """
+        Returns the parts of to_json that changed since the given version, and the new version to pass next time.
+        Only changed board rows are included, under board.rows by row index, and the ghost tetromino is included when
+        the current tetromino or the board changed. Version 0 returns everything.
+        """
+        new_version = self.sync()
+        tracker = self.state_tracker
+        diff: Dict[str, Any] = {'version': new_version}
+        if tracker.changed_since('current_tetromino', version):
+            diff['current_tetromino'] = self.current_tetromino.to_json()
+        if tracker.changed_since('held_tetromino', version):
+            diff['held_tetromino'] = self.held_tetromino.to_json() if self.held_tetromino else None
+        if tracker.changed_since('tetromino_queue', version):
+            diff['tetromino_queue'] = self.tetromino_queue.to_json()
+        if tracker.changed_since('stats', version):
+            diff['stats'] = self.stats
+        if tracker.changed_since('board', version):
+            rows = {row: list(self.board[row]) for row in range(self.board.height)
+                    if tracker.changed_since(('row', row), version)}
+            diff['board'] = {'width': self.board.width, 'height': self.board.height, 'rows': rows}
+        if 'current_tetromino' in diff or 'board' in diff:
+            diff['ghost_tetromino'] = self.ghost_tetromino.to_json()
+        return diff
+
+    @staticmethod
+    def apply_diff(state: Dict[str, Any], diff: Dict[str, Any]) -> Dict[str, Any]:
+        """ Applies a diff to a state in the format of to_json in place, an empty state is built up by a version 0 diff. """
+        for key, value in diff.items():
+            if key == 'board':
+                board = state.setdefault('board', {'width': value['width'], 'height': value['height'],
+                                                   'cells': [[None] * value['width'] for _ in range(value['height'])]})
+                for row, cells in value['rows'].items():
+                    board['cells'][row] = cells
+            elif key != 'version':
+                state[key] = value
+        return state
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {
+            'cleared_lines': self.cleared_lines,
+            'level': self.level,
+            'score': self.score,
+            'high_score': self.high_score,
+        }
+
     def to_json(self) -> Dict[str, Any]:
-        self.current_tetromino.to_json()
-        self.held_tetromino.to_json() if self.held_tetromino else None
-        self.ghost_tetromino.to_json()
-        self.tetromino_queue.to_json()
-        self.board.to_json()
         return {
             'current_tetromino': self.current_tetromino.to_json(),
             'held_tetromino': self.held_tetromino.to_json() if self.held_tetromino else None,
             'ghost_tetromino': self.ghost_tetromino.to_json(),
             'tetromino_queue': self.tetromino_queue.to_json(),
             'board': self.board.to_json(),
-            'stats': {
-                'cleared_lines': self.cleared_lines,
-                'level': self.level,
-                'score': self.score,
-                'high_score': self.high_score,
-            },
+            'stats': self.stats,
         }
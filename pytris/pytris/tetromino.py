@@ -48,6 +48,45 @@ Rotation = Tuple[Block, Block, Block, Block]
 Rotations = Tuple[Rotation, ...]
 
 
+@dataclass(frozen=True)
+class Shape:
+    """ Precomputed geometry of a single rotation, built once at import. """
+    rotation: Rotation
+    left: int
+    right: int
+    top: int
+    bottom: int
+    # (j, mask) for every occupied row, bit i of the mask is set if block (i, j) is in the rotation
+    row_masks: Tuple[Tuple[int, int], ...]
+    # (i, j) of the lowest and highest block in every occupied column
+    column_bottoms: Tuple[Block, ...]
+    column_tops: Tuple[Block, ...]
+
+    @property
+    def width(self) -> int:
+        return self.right - self.left + 1
+
+    @property
+    def height(self) -> int:
+        return self.bottom - self.top + 1
+
+    @classmethod
+    def from_rotation(cls, rotation: Rotation) -> 'Shape':
+        columns = sorted({i for i, j in rotation})
+        rows = sorted({j for i, j in rotation})
+        return cls(rotation=rotation,
+                   left=columns[0],
+                   right=columns[-1],
+                   top=rows[0],
+                   bottom=rows[-1],
+                   row_masks=tuple((row, sum(1 << i for i, j in rotation if j == row)) for row in rows),
+                   column_bottoms=tuple((col, max(j for i, j in rotation if i == col)) for col in columns),
+                   column_tops=tuple((col, min(j for i, j in rotation if i == col)) for col in columns))
+
+
+SHAPES = {name: tuple(Shape.from_rotation(rotation) for rotation in rotations) for name, rotations in ROTATIONS.items()}
+
+
 @dataclass
 class Tetromino:
     name: str
@@ -62,35 +101,40 @@ class Tetromino:
         """ Returns the current rotation of the Tetromino. """
         return self.rotations[self.rotation_index]
 
+    @property
+    def shape(self) -> Shape:
+        """ Returns the precomputed geometry of the current rotation. """
+        return SHAPES[self.name][self.rotation_index]
+
     @property
     def right(self) -> int:
         """ Returns the right index in the current rotation. """
-        return max(i for i, j in self.rotation)
+        return self.shape.right
 
     @property
     def left(self) -> int:
         """ Returns the left index in the current rotation. """
-        return min(i for i, j in self.rotation)
+        return self.shape.left
 
     @property
     def top(self) -> int:
         """ Returns the top index in the current rotation. """
-        return min(j for i, j in self.rotation)
+        return self.shape.top
 
     @property
     def bottom(self) -> int:
         """ Returns the bottom index in the current rotation. """
-        return max(j for i, j in self.rotation)
+        return self.shape.bottom
 
     @property
     def width(self) -> int:
         """ Returns the width of the Tetromino. """
-        return abs(self.left - self.right) + 1
+        return self.shape.width
 
     @property
     def height(self) -> int:
         """ Returns the height of the Tetromino. """
-        return abs(self.top - self.bottom) + 1
+        return self.shape.height
 
     def to_json(self) -> Dict[str, Any]:
         return {
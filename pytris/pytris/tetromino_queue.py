@@ -1,6 +1,6 @@
 from dataclasses import dataclass
-from random import shuffle
-from typing import Any, Dict, List
+from random import Random
+from typing import Any, Dict, List, Optional
 
 from pytris.tetromino import NAMES, Tetromino
 from pytris.utils.queue import Queue
@@ -8,12 +8,14 @@ from pytris.utils.queue import Queue
 
 @dataclass
 class TetrominoQueue(Queue[Tetromino]):
-    def __init__(self) -> None:
+    def __init__(self, seed: Optional[int] = None) -> None:
+        """ A queue of tetrominoes filled a shuffled bag at a time, queues with equal seeds yield equal sequences. """
         super().__init__()
+        self.random = Random(seed)
 
     def update(self) -> None:
         bag = NAMES.copy()
-        shuffle(bag)
+        self.random.shuffle(bag)
         for name in bag:
             self.insert(Tetromino(name))
 
@@ -0,0 +1,158 @@
+from functools import lru_cache
+from random import Random
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from pytris.engine import UNIQUE_ROTATIONS, get_placement_table
+from pytris.tetris import HARD_DROP_SCORE, SPAWN_Y, get_line_clear_score
+from pytris.tetromino import NAMES
+
+ActionTable = Tuple[Tuple[Tuple[int, int], ...], np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+
+
+@lru_cache(maxsize=None)
+def get_action_table(width: int) -> ActionTable:
+    """
+    Flattens the placements of every tetromino into padded action arrays, indexed by [tetromino index, action].
+    :return: the (rotation, x) of every action per tetromino, and arrays of the row offsets, shifted row masks,
+             occupied columns and lowest block per column of every action, padded with zero masks and column -1
+    """
+    placement_table = get_placement_table(width)
+    actions = tuple(tuple((rotation, x) for rotation in UNIQUE_ROTATIONS[name] for x in placement_table[name][rotation])
+                    for name in NAMES)
+    num_of_actions = max(len(tetromino_actions) for tetromino_actions in actions)
+    row_offsets = np.zeros((len(NAMES), num_of_actions, 4), dtype=np.int64)
+    row_masks = np.zeros((len(NAMES), num_of_actions, 4), dtype=np.int64)
+    columns = np.full((len(NAMES), num_of_actions, 4), -1, dtype=np.int64)
+    bottoms = np.zeros((len(NAMES), num_of_actions, 4), dtype=np.int64)
+    for p, name in enumerate(NAMES):
+        for a, (rotation, x) in enumerate(actions[p]):
+            masks, column_profile = placement_table[name][rotation][x]
+            for k, (j, mask) in enumerate(masks):
+                row_offsets[p, a, k], row_masks[p, a, k] = j, mask
+            for k, (col, _, bottom) in enumerate(column_profile):
+                columns[p, a, k], bottoms[p, a, k] = col, bottom
+    valid = (row_masks != 0).any(axis=2)
+    return actions, row_offsets, row_masks, columns, bottoms, valid
+
+
+class VectorEngine:
+    def __init__(self, num_of_games: int, width: int = 10, height: int = 20,
+                 seeds: Optional[Sequence[Optional[int]]] = None) -> None:
+        """
+        Plays N independent headless games in lockstep, the boards of all games are kept in one (N, height) array of
+        row bitmasks and every step places one tetromino in every game that isn't over. Holding isn't supported.
+        :param num_of_games: number of games played together
+        :param width: number of columns in every board
+        :param height: number of rows in every board
+        :param seeds: seed of every game's bag generator, games with equal seeds get equal tetromino sequences
+        """
+        self.num_of_games = num_of_games
+        self.width = width
+        self.height = height
+        self.full_row = (1 << width) - 1
+        self.actions, self.row_offsets, self.row_masks, self.columns, self.bottoms, self.valid = get_action_table(width)
+        self.reset(seeds)
+
+    def reset(self, seeds: Optional[Sequence[Optional[int]]] = None) -> None:
+        if seeds is None:
+            seeds = [None] * self.num_of_games
+        self.randoms = [Random(seed) for seed in seeds]
+        self.rows = np.zeros((self.num_of_games, self.height), dtype=np.int64)
+        self.tops = np.full((self.num_of_games, self.width), self.height, dtype=np.int64)
+        # a ring of two bags per game, the current bag and the next one, which is refilled as the game moves past it
+        self.sequences = np.zeros((self.num_of_games, 2 * len(NAMES)), dtype=np.int64)
+        self.positions = np.zeros(self.num_of_games, dtype=np.int64)
+        self.cleared_lines = np.zeros(self.num_of_games, dtype=np.int64)
+        self.score = np.zeros(self.num_of_games, dtype=np.int64)
+        self.terminal = np.zeros(self.num_of_games, dtype=bool)
+        games = np.arange(self.num_of_games)
+        self.update_sequences(games, 0)
+        self.update_sequences(games, 1)
+
+    def update_sequences(self, games: np.ndarray, bag_index: int) -> None:
+        """ Fills the ring slot of the given bag index with the next shuffled bag of every given game. """
+        start = bag_index % 2 * len(NAMES)
+        for game in games:
+            bag = list(range(len(NAMES)))
+            self.randoms[game].shuffle(bag)
+            self.sequences[game, start:start + len(NAMES)] = bag
+
+    @property
+    def current_tetrominoes(self) -> np.ndarray:
+        """ Returns the index in NAMES of every game's current tetromino. """
+        return self.sequences[np.arange(self.num_of_games), self.positions % self.sequences.shape[1]]
+
+    def landing_y(self, tetrominoes: np.ndarray) -> np.ndarray:
+        """ Returns an (N, actions) array of the y every action of the given tetrominoes lands at. """
+        columns = self.columns[tetrominoes]
+        games = np.arange(self.num_of_games)[:, np.newaxis, np.newaxis]
+        tops = np.where(columns >= 0, self.tops[games, np.maximum(columns, 0)] - self.bottoms[tetrominoes], self.height)
+        return tops.min(axis=2) - 1
+
+    def afterstates(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Places every action of the current tetrominoes without clearing rows.
+        :return: an (N, actions, height) array of the resulting boards, and an (N, actions) mask of the real actions
+        """
+        tetrominoes = self.current_tetrominoes
+        target_rows = self.landing_y(tetrominoes)[:, :, np.newaxis] + self.row_offsets[tetrominoes]
+        row_masks = self.row_masks[tetrominoes]
+        # blocks above the top, and padding, are written to an extra row which is dropped afterwards
+        target_rows = np.where((target_rows >= 0) & (row_masks != 0), target_rows, self.height)
+        placed = np.zeros(target_rows.shape[:2] + (self.height + 1,), dtype=np.int64)
+        np.put_along_axis(placed, target_rows, row_masks, axis=2)
+        return self.rows[:, np.newaxis, :] | placed[:, :, :self.height], self.valid[tetrominoes]
+
+    def step(self, actions: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Places the current tetromino of every game that isn't over, by its index into that tetromino's actions.
+        :return: the number of lines every game cleared in this step, and the terminal mask of all games
+        """
+        tetrominoes = self.current_tetrominoes
+        active = ~self.terminal
+        games = np.arange(self.num_of_games)
+        if not self.valid[tetrominoes[active], actions[active]].all():
+            raise ValueError('Every active game needs a valid action for its current tetromino')
+
+        y = self.landing_y(tetrominoes)[games, actions]
+        target_rows = y[:, np.newaxis] + self.row_offsets[tetrominoes, actions]
+        row_masks = np.where(active[:, np.newaxis], self.row_masks[tetrominoes, actions], 0)
+        topped_out = ((target_rows < 0) & (row_masks != 0)).any(axis=1)
+        target_rows = np.where((target_rows >= 0) & (row_masks != 0), target_rows, self.height)
+        placed = np.zeros((self.num_of_games, self.height + 1), dtype=np.int64)
+        np.put_along_axis(placed, target_rows, row_masks, axis=1)
+        self.rows |= placed[:, :self.height]
+
+        full = self.rows == self.full_row
+        cleared_lines = full.sum(axis=1)
+        if cleared_lines.any():
+            # full rows sort before the rest, keeping the order of the rest, and are then emptied
+            order = np.argsort(~full, axis=1, kind='stable')
+            self.rows = np.take_along_axis(self.rows, order, axis=1)
+            self.rows[np.arange(self.height) < cleared_lines[:, np.newaxis]] = 0
+
+        cells = (self.rows[:, :, np.newaxis] >> np.arange(self.width, dtype=np.int64)) & 1 == 1
+        self.tops = np.where(cells.any(axis=1), cells.argmax(axis=1), self.height)
+
+        line_clear_score = np.zeros(self.num_of_games, dtype=np.int64)
+        # clears are rare, so they're scored one by one with the same rules as every other game implementation
+        for game in np.flatnonzero(cleared_lines):
+            line_clear_score[game] = get_line_clear_score(cleared_lines[game], self.cleared_lines[game])
+        self.score += np.where(active, HARD_DROP_SCORE * (y - SPAWN_Y) + line_clear_score, 0)
+        self.cleared_lines += cleared_lines
+        self.terminal |= active & (topped_out | (self.rows[:, 0] != 0))
+
+        self.positions += active
+        # games that moved into their next bag get the bag after it
+        entered = np.flatnonzero(active & (self.positions % len(NAMES) == 0))
+        if len(entered):
+            for bag_index in (0, 1):
+                games = entered[self.positions[entered] // len(NAMES) % 2 == bag_index]
+                self.update_sequences(games, bag_index + 1)
+        return cleared_lines, self.terminal.copy()
+
+    def actions_of(self, tetromino: str) -> List[Tuple[int, int]]:
+        """ Returns the (rotation, x) each action index stands for, for the given tetromino. """
+        return list(self.actions[NAMES.index(tetromino)])
@@ -4,8 +4,18 @@ os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'
 os.environ['PYGAME_FREETYPE'] = '1'
 os.environ['SDL_VIDEO_WINDOW_POS'] = '0,0'
 
-from pygame import display
 
-display.init()
-info = display.Info()
-DISPLAY_WIDTH, DISPLAY_HEIGHT = info.current_w, info.current_h
+def __getattr__(name: str) -> int:
+    """
+    Queries the desktop size on first access of DISPLAY_WIDTH or DISPLAY_HEIGHT, instead of on import.
+    The desktop size doesn't change when a window is opened, unlike display.Info, so it's the same whenever it's read.
+    """
+    if name not in ('DISPLAY_WIDTH', 'DISPLAY_HEIGHT'):
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+    from pygame import display
+
+    display.init()
+    width, height = display.get_desktop_sizes()[0]
+    globals().update(DISPLAY_WIDTH=width, DISPLAY_HEIGHT=height)
+    return globals()[name]
@@ -0,0 +1,29 @@
+from typing import Dict
+
+import pygame as pg
+
+from pyview.surface import Surface
+from pyview.utils.blit import blit_unblended
+
+
+class Atlas(Surface):
+    def __init__(self, images: Dict[str, Surface], max_width: int = 1024) -> None:
+        """
+        Packs many small images into one surface, so any number of them can be drawn with a single batched blit,
+        see Surface.blit_sprites.
+        :param images: the images by name
+        :param max_width: width past which the images are packed in a new row
+        """
+        self.rects: Dict[str, pg.Rect] = {}
+        x = y = row_height = width = 0
+        for name, image in sorted(images.items(), key=lambda item: -item[1].height):
+            if x and x + image.width > max_width:
+                x, y, row_height = 0, y + row_height, 0
+            self.rects[name] = pg.Rect((x, y), image.size)
+            x += image.width
+            row_height = max(row_height, image.height)
+            width = max(width, x)
+
+        super().__init__(width, y + row_height)
+        self.fill((0, 0, 0, 0))
+        blit_unblended(self.image, [(images[name].image, rect, None) for name, rect in self.rects.items()])
@@ -1,22 +1,50 @@
-from typing import Literal, Tuple
+from collections import OrderedDict
+from typing import Dict, Literal, Tuple
 
+import pygame as pg
 from pygame.freetype import Font as FreeTypeFont
 
 from pyview.surface import Surface
+from pyview.utils.blit import blit_unblended
 
 LTR = 'ltr'
 RTL = 'rtl'
 CENTER = 'center'
 
+# a rendered glyph, its bounding rect relative to the pen position and baseline, and its horizontal advance
+Glyph = Tuple[pg.Surface, pg.Rect, float]
+
 
 class Font:
-    def __init__(self, filepath: str) -> None:
+    def __init__(self, filepath: str, cache_size: int = 256) -> None:
+        """
+        :param filepath: path of the font file
+        :param cache_size: number of rendered texts to keep, the least recently used is dropped first
+        """
         self.font = FreeTypeFont(filepath)
+        self.cache_size = cache_size
+        self.cache: 'OrderedDict[tuple, Surface]' = OrderedDict()
+        # rendered digits by (digit, color, size), numbers are composed from them instead of being rendered whole
+        self.glyphs: Dict[Tuple[str, Tuple[int, int, int], float], Glyph] = {}
 
     def render(self, text: str, color: Tuple[int, int, int], size: int, background: Tuple[int, int, int] = None,
                align: Literal['ltr', 'rtl', 'center'] = CENTER, spacing: int = 0) -> Surface:
+        """ Renders the text, or returns it from the cache. Cached surfaces are shared, so they must not be drawn on. """
+        key = (text, color, size, background, align, spacing)
+        rendered_text = self.cache.get(key)
+        if rendered_text is not None:
+            self.cache.move_to_end(key)
+            return rendered_text
+
+        rendered_text = self.cache[key] = self.render_text(text, color, size, background, align, spacing)
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return rendered_text
+
+    def render_text(self, text: str, color: Tuple[int, int, int], size: int, background: Tuple[int, int, int] = None,
+                    align: Literal['ltr', 'rtl', 'center'] = CENTER, spacing: int = 0) -> Surface:
         split_text = text.split('\n')
-        rendered_split_text = [Surface(image=self.font.render(line, fgcolor=color, size=size * 2)[0]) for line in split_text]
+        rendered_split_text = [Surface(image=self.render_line(line, color, size * 2)) for line in split_text]
         rendered_text = Surface(width=max(line.width for line in rendered_split_text),
                                 height=len(rendered_split_text) * (size + spacing) - spacing)
         for i, line in enumerate(rendered_split_text):
@@ -39,3 +67,34 @@ class Font:
         background_surface.fill(background)
         background_surface.blit(rendered_text, offset, offset)
         return background_surface
+
+    def render_line(self, line: str, color: Tuple[int, int, int], size: float) -> pg.Surface:
+        if line.isascii() and line.isdigit():
+            return self.render_number(line, color, size)
+        return self.font.render(line, fgcolor=color, size=size)[0]
+
+    def get_glyph(self, char: str, color: Tuple[int, int, int], size: float) -> Glyph:
+        key = (char, color, size)
+        glyph = self.glyphs.get(key)
+        if glyph is None:
+            image, rect = self.font.render(char, fgcolor=color, size=size)
+            glyph = self.glyphs[key] = image, rect, self.font.get_metrics(char, size)[0][4]
+        return glyph
+
+    def render_number(self, number: str, color: Tuple[int, int, int], size: float) -> pg.Surface:
+        """ Composes a line of digits from their cached glyphs, laid out like freetype lays out the whole line. """
+        glyphs = [self.get_glyph(digit, color, size) for digit in number]
+        pens = []
+        pen = 0.
+        for _, _, advance in glyphs:
+            pens.append(pen)
+            pen += advance
+
+        left = min(pen + rect.x for pen, (_, rect, _) in zip(pens, glyphs))
+        right = max(pen + rect.right for pen, (_, rect, _) in zip(pens, glyphs))
+        top = max(rect.y for _, rect, _ in glyphs)
+        bottom = min(rect.y - rect.height for _, rect, _ in glyphs)
+        image = pg.Surface((int(right - left), top - bottom), pg.SRCALPHA)
+        blit_unblended(image, [(glyph_image, (int(pen + rect.x - left), top - rect.y), None)
+                               for pen, (glyph_image, rect, _) in zip(pens, glyphs)])
+        return image
@@ -4,7 +4,8 @@ import os
 from _ast import ClassDef
 from functools import cached_property
 from pathlib import Path
-from typing import List
+from types import ModuleType
+from typing import Dict, Tuple
 
 import pygame as pg
 
@@ -18,7 +19,10 @@ class ScreenManager:
         pg.display.set_mode((1, 1))
 
         self.run = True
-        self.screens = {screen.id: screen for screen in self.import_screens(screen_dir)}
+        # screens are only imported and constructed when they're first opened
+        self.screen_classes = self.find_screens(screen_dir)
+        self.modules: Dict[Path, ModuleType] = {}
+        self.screens: Dict[str, Screen] = {}
         self.current_screen_id = screen_id
         self.set_display()
 
@@ -35,6 +39,8 @@ class ScreenManager:
         """ Sets screen as main screen. """
         pg.display.set_mode(self.current_screen.size)
         pg.display.set_caption(self.current_screen.id)
+        # the new window is blank, so all of the screen is repainted
+        self.current_screen.mark_dirty()
 
     def handle_event(self, event: pg.event.Event) -> None:
         """ Handles all allowed event types. """
@@ -66,12 +72,14 @@ class ScreenManager:
             self.handle_event(event)
 
     def execute(self) -> None:
-        """ Execution of a single frame. """
+        """ Execution of a single frame, only the regions of the screen that changed are repainted and flipped. """
         self.handle_events()
         self.current_screen.update()
         self.current_screen.clock()
-        self.window.blit(self.current_screen.image, (0, 0))
-        pg.display.update()
+        dirty_rects = self.current_screen.pop_dirty_rects()
+        if dirty_rects:
+            self.window.blits([(self.current_screen.image, rect, rect) for rect in dirty_rects], doreturn=False)
+            pg.display.update(dirty_rects)
 
     def main_loop(self) -> None:
         while self.run:
@@ -83,12 +91,29 @@ class ScreenManager:
 
     @property
     def current_screen(self) -> Screen:
-        return self.screens[self.current_screen_id]
+        screen = self.screens.get(self.current_screen_id)
+        if screen is None:
+            screen = self.screens[self.current_screen_id] = self.load_screen(self.current_screen_id)
+        return screen
+
+    def load_screen(self, screen_id: str) -> Screen:
+        """ Imports the module of the screen mapped to the screen id, if it wasn't imported yet, and constructs the screen. """
+        try:
+            path, class_name = self.screen_classes[screen_id]
+        except KeyError:
+            raise ValueError(f'No screen with the id {screen_id}')
+
+        module = self.modules.get(path)
+        if module is None:
+            spec = importlib.util.spec_from_file_location(path.stem, path)
+            module = self.modules[path] = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+        return getattr(module, class_name)()
 
     @staticmethod
-    def import_screens(screen_dir: str) -> List[Screen]:
-        """ Returns a list of all screens in the given directory. """
-        screens = []
+    def find_screens(screen_dir: str) -> Dict[str, Tuple[Path, str]]:
+        """ Returns the file and class name of every screen in the given directory by id, without importing them. """
+        screen_classes = {}
         for root, _, files in os.walk(screen_dir):
             for filename in files:
                 path = Path(os.path.join(root, filename))
@@ -103,9 +128,6 @@ class ScreenManager:
                         if not isinstance(class_definition, ClassDef) or class_definition.bases[0].id != 'Screen':
                             continue
 
-                        spec = importlib.util.spec_from_file_location(path.stem, path)
-                        module = importlib.util.module_from_spec(spec)
-                        spec.loader.exec_module(module)
-                        cls = getattr(module, class_definition.name)
-                        screens.append(cls())
-        return screens
+                        # a screen's id is its class name
+                        screen_classes[class_definition.name] = path, class_definition.name
+        return screen_classes
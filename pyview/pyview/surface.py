@@ -1,29 +1,75 @@
-from typing import TYPE_CHECKING, Tuple
+import os
+from typing import TYPE_CHECKING, Iterable, List, Tuple
 
 import pygame as pg
 
 if TYPE_CHECKING:
+    from pyview.atlas import Atlas
     from pyview.widget import Widget
 
+# past this many dirty rects they're merged into their bounding rect, tracking every small blit costs more than it saves
+MAX_DIRTY_RECTS = 16
+
 
 class Surface:
     def __init__(self, width: float = None, height: float = None, image: pg.Surface = None) -> None:
         if image is None:
             self.image = pg.Surface((width, height)).convert_alpha()
+        elif image.get_size() == (int(width or image.get_width()), int(height or image.get_height())):
+            self.image = image.convert_alpha()
         else:
             self.image = pg.transform.smoothscale(image, (width or image.get_width(),
                                                           height or image.get_height())).convert_alpha()
+        # regions changed since the surface was last repainted onto its parent, all of it at first
+        self.dirty_rects: List[pg.Rect] = [self.image.get_rect()]
+
+    def mark_dirty(self, rect: pg.Rect = None) -> None:
+        """ Marks a region of the surface, all of it by default, as changed since it was last repainted. """
+        rect = self.image.get_rect() if rect is None else rect.clip(self.image.get_rect())
+        if not rect.width or not rect.height:
+            return
+        if any(dirty_rect.contains(rect) for dirty_rect in self.dirty_rects):
+            return
+
+        self.dirty_rects = [dirty_rect for dirty_rect in self.dirty_rects if not rect.contains(dirty_rect)]
+        self.dirty_rects.append(rect)
+        if len(self.dirty_rects) > MAX_DIRTY_RECTS:
+            self.dirty_rects = [rect.unionall(self.dirty_rects)]
+
+    def pop_dirty_rects(self) -> List[pg.Rect]:
+        """ Returns the regions changed since the last call, and marks the surface as clean. """
+        dirty_rects, self.dirty_rects = self.dirty_rects, []
+        return dirty_rects
 
     def blit(self, surface: 'Surface', x: float, y: float, centered: bool = False) -> None:
         if centered:
             x -= surface.width / 2
             y -= surface.height / 2
 
-        self.image.blit(surface.image, (x, y))
+        self.mark_dirty(self.image.blit(surface.image, (x, y)))
+
+    def blit_sprites(self, atlas: 'Atlas', sprites: Iterable[Tuple[str, float, float]]) -> None:
+        """ Draws (name, x, y) images of the atlas in a single batched blit. """
+        rects = self.image.blits([(atlas.image, (x, y), atlas.rects[name]) for name, x, y in sprites])
+        if rects:
+            self.mark_dirty(rects[0].unionall(rects[1:]))
 
     def blit_widget(self, widget: 'Widget') -> None:
         self.blit(widget, widget.x, widget.y)
 
+    def blit_changes(self, widget: 'Widget', background: Tuple[int, int, int] = None) -> None:
+        """
+        Repaints only the regions of the widget that changed since it was last repainted, so a widget that didn't change
+        costs nothing. The widget must not overlap other widgets, since the regions are repainted over the background.
+        :param widget: the widget to repaint, its dirty regions are cleared
+        :param background: color to clear the regions with before repainting them, for widgets with transparency
+        """
+        for rect in widget.pop_dirty_rects():
+            position = (widget.x + rect.x, widget.y + rect.y)
+            if background is not None:
+                self.image.fill(background, (*position, *rect.size))
+            self.mark_dirty(self.image.blit(widget.image, position, rect))
+
     def fill(self, color: Tuple[int, int, int], x: float = 0, y: float = 0, width: float = None,
              height: float = None, centered: bool = False) -> None:
         """ Colors a specified portion of the screen with the given Color. """
@@ -31,8 +77,8 @@ class Surface:
             x -= width * .5
             y -= height * .5
 
-        self.image.fill(rect=(x, y, width or self.width - x, height or self.height - y),
-                        color=color)
+        self.mark_dirty(self.image.fill(rect=(x, y, width or self.width - x, height or self.height - y),
+                                        color=color))
 
     @property
     def width(self) -> int:
@@ -41,6 +87,7 @@ class Surface:
     @width.setter
     def width(self, width: float) -> None:
         self.image = pg.transform.smoothscale(self.image, (width, self.height))
+        self.dirty_rects = [self.image.get_rect()]
 
     @property
     def height(self) -> int:
@@ -49,6 +96,7 @@ class Surface:
     @height.setter
     def height(self, height: float) -> None:
         self.image = pg.transform.smoothscale(self.image, (self.width, height))
+        self.dirty_rects = [self.image.get_rect()]
 
     @property
     def size(self) -> Tuple[int, int]:
@@ -57,7 +105,33 @@ class Surface:
     @size.setter
     def size(self, size: Tuple[int, int]) -> None:
         self.image = pg.transform.smoothscale(self.image, size)
+        self.dirty_rects = [self.image.get_rect()]
 
     @classmethod
-    def load(cls, filename, width: float = None, height: float = None) -> 'Surface':
-        return cls(width, height, pg.image.load(filename))
+    def load(cls, filename, width: float = None, height: float = None, cache_directory: str = None) -> 'Surface':
+        """
+        Loads an image, scaled to the given size.
+        :param filename: path of the image
+        :param width: width to scale the image to, its own width by default
+        :param height: height to scale the image to, its own height by default
+        :param cache_directory: directory to keep images scaled to both a width and a height in, so they're only scaled
+                                once per size, unless the image changes
+        """
+        if cache_directory is None or width is None or height is None:
+            return cls(width, height, pg.image.load(filename))
+
+        stem, extension = os.path.splitext(os.path.basename(filename))
+        cached_filename = os.path.join(cache_directory, f'{stem}.{int(width)}x{int(height)}{extension}')
+        if os.path.exists(cached_filename) and os.path.getmtime(cached_filename) >= os.path.getmtime(filename):
+            return cls(width, height, pg.image.load(cached_filename))
+
+        surface = cls(width, height, pg.image.load(filename))
+        try:
+            os.makedirs(cache_directory, exist_ok=True)
+            temporary_filename = f'{cached_filename}.{os.getpid()}{extension}'
+            pg.image.save(surface.image, temporary_filename)
+            os.replace(temporary_filename, cached_filename)
+        except (OSError, pg.error):
+            # the cache is only an optimization
+            pass
+        return surface
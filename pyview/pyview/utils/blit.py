@@ -0,0 +1,16 @@
+from typing import Iterable, Optional, Tuple, Union
+
+import pygame as pg
+
+Destination = Union[Tuple[float, float], pg.Rect]
+
+
+def blit_unblended(target: pg.Surface, sequence: Iterable[Tuple[pg.Surface, Destination, Optional[pg.Rect]]]) -> None:
+    """
+    Copies (image, destination, area) blits into fully transparent regions of the target in one batched call, keeping
+    the images' own alpha instead of blending it with the target's.
+    Every channel of a transparent pixel is 0, so taking the max of every channel yields the image's pixel unchanged,
+    which is only true while the images don't overlap each other or anything already drawn.
+    """
+    target.blits([(image, destination, area, pg.BLEND_RGBA_MAX) for image, destination, area in sequence],
+                 doreturn=False)
@@ -0,0 +1,25 @@
+from typing import Any, Callable
+
+
+class LazyDescriptor:
+    def __init__(self, load: Callable[..., Any], *args, **kwargs) -> None:
+        self.load = load
+        self.args = args
+        self.kwargs = kwargs
+        self.name = None
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+
+    def __get__(self, obj, klass=None) -> Any:
+        if klass is None:
+            klass = type(obj)
+        value = self.load(*self.args, **self.kwargs)
+        # replaces the descriptor, later accesses are plain attribute lookups
+        setattr(klass, self.name, value)
+        return value
+
+
+def lazy(load: Callable[..., Any], *args, **kwargs) -> LazyDescriptor:
+    """ A class attribute that is set to load(*args, **kwargs) on its first access. """
+    return LazyDescriptor(load, *args, **kwargs)
@@ -1,8 +1,10 @@
 import os
 from typing import Any
 
+from pyview.atlas import Atlas
 from pyview.font import Font
 from pyview.surface import Surface
+from pyview.utils.lazy import lazy
 from tetris.consts import Consts
 
 
@@ -18,8 +20,14 @@ class Assets(metaclass=AssetsMeta):
     pass
 
 
+def load_image(filename: str, width: float = Consts.block_size, height: float = Consts.block_size) -> Surface:
+    return Surface.load(os.path.join(Consts.images_directory, filename), width, height,
+                        cache_directory=Consts.cache_directory)
+
+
+# every asset is loaded on its first access, so only the assets of the screens that were opened are ever loaded
 class Fonts(Assets):
-    pixel = Font(os.path.join(Consts.fonts_directory, 'pixelboy.ttf'))
+    pixel = lazy(Font, os.path.join(Consts.fonts_directory, 'pixelboy.ttf'))
 
 
 class Colors(Assets):
@@ -29,16 +37,20 @@ class Colors(Assets):
 
 
 class Images(Assets):
-    O = Surface.load(os.path.join(Consts.images_directory, 'O.png'), Consts.block_size, Consts.block_size)
-    I = Surface.load(os.path.join(Consts.images_directory, 'I.png'), Consts.block_size, Consts.block_size)
-    T = Surface.load(os.path.join(Consts.images_directory, 'T.png'), Consts.block_size, Consts.block_size)
-    L = Surface.load(os.path.join(Consts.images_directory, 'L.png'), Consts.block_size, Consts.block_size)
-    J = Surface.load(os.path.join(Consts.images_directory, 'J.png'), Consts.block_size, Consts.block_size)
-    S = Surface.load(os.path.join(Consts.images_directory, 'S.png'), Consts.block_size, Consts.block_size)
-    Z = Surface.load(os.path.join(Consts.images_directory, 'Z.png'), Consts.block_size, Consts.block_size)
-    border = Surface.load(os.path.join(Consts.images_directory, 'border.png'), Consts.block_size, Consts.block_size)
-    ghost = Surface.load(os.path.join(Consts.images_directory, 'ghost.png'), Consts.block_size, Consts.block_size)
-    back = Surface.load(os.path.join(Consts.images_directory, 'back.png'), 50, 50)
+    O = lazy(load_image, 'O.png')
+    I = lazy(load_image, 'I.png')
+    T = lazy(load_image, 'T.png')
+    L = lazy(load_image, 'L.png')
+    J = lazy(load_image, 'J.png')
+    S = lazy(load_image, 'S.png')
+    Z = lazy(load_image, 'Z.png')
+    border = lazy(load_image, 'border.png')
+    ghost = lazy(load_image, 'ghost.png')
+    back = lazy(load_image, 'back.png', 50, 50)
+
+
+class Sprites(Assets):
+    blocks = lazy(lambda: Atlas({name: Images[name] for name in ('O', 'I', 'T', 'L', 'J', 'S', 'Z', 'ghost')}))
 
 
 class Sounds(Assets):
@@ -10,6 +10,8 @@ class Consts:
     images_directory = os.path.join(assets_directory, 'images')
     fonts_directory = os.path.join(assets_directory, 'fonts')
     sounds_directory = os.path.join(assets_directory, 'sounds')
+    # images scaled to the display, by size
+    cache_directory = os.path.join(assets_directory, 'cache')
 
     display_width = DISPLAY_WIDTH
     display_height = DISPLAY_HEIGHT
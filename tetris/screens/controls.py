@@ -17,12 +17,12 @@ Escape or F1 to pause"""
 class Controls(Screen):
     def __init__(self) -> None:
         super().__init__(700, 500, fps=30)
+        self.fill(Colors.black)
 
     def update(self) -> None:
-        self.fill(Colors.black)
-        self.blit_widget(self.title)
-        self.blit_widget(self.controls)
-        self.blit_widget(self.back)
+        self.blit_changes(self.title, Colors.black)
+        self.blit_changes(self.controls, Colors.black)
+        self.blit_changes(self.back, Colors.black)
 
     def mouse_down(self, x: float, y: float) -> None:
         if self.back.overlap(x, y):
@@ -1,13 +1,17 @@
 import os
 from functools import cached_property
-from typing import Dict, Iterable, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 
+import pygame as pg
+
+from pytris import Tetris
 from pytris.controller import TetrisController
 from pyview.key import Key
 from pyview.screen import Screen
 from pyview.surface import Surface
+from pyview.utils.blit import blit_unblended
 from pyview.widget import Widget
-from tetris.assets import Colors, Fonts, Images
+from tetris.assets import Colors, Fonts, Images, Sprites
 from tetris.consts import Consts
 
 
@@ -32,18 +36,51 @@ class Border(Widget):
         self.fill(Colors.transparent, Consts.block_size, Consts.block_size + self.offset,
                   self.width - Consts.block_size * 2, self.height - Consts.block_size * 2 - self.offset)
 
-    def draw_cells(self, cells: Iterable[Iterable[str]]) -> None:
-        for j, row in enumerate(cells):
-            for i, cell in enumerate(row):
-                if cell is None:
-                    continue
+    def draw_tetromino(self, name: str, x: float, y: float, rotation: Iterable[Tuple[int, int]]) -> None:
+        self.blit_sprites(Sprites.blocks, [(name, x + (i + 1) * Consts.block_size,
+                                            y + (j + 1) * Consts.block_size + self.offset) for i, j in rotation])
 
-                image = Images[cell]
-                self.blit(image, (i + 1) * Consts.block_size, (j + 1) * Consts.block_size + self.offset)
+
+class Board(Border):
+    def __init__(self, x: float, y: float, width: int, height: int, title: Surface = None, centered: bool = False) -> None:
+        """
+        A border whose locked cells are drawn on a layer of their own, only for the rows that changed. The tetrominoes are
+        drawn over the layer, and the regions they covered are copied back from it before they're drawn again.
+        """
+        super().__init__(x, y, width, height, title=title, centered=centered)
+        self.interior = pg.Rect(Consts.block_size, Consts.block_size + self.offset,
+                                self.width - Consts.block_size * 2, self.height - Consts.block_size * 2 - self.offset)
+        self.cells = Surface(*self.interior.size)
+        self.cells.fill(Colors.transparent)
+        # regions of the interior that differ from the cells layer
+        self.stale: List[pg.Rect] = []
+
+    def draw_rows(self, rows: Dict[int, List[Optional[str]]]) -> None:
+        """ Redraws the given rows of the cells layer, by index. """
+        for j in rows:
+            self.cells.fill(Colors.transparent, 0, j * Consts.block_size, self.cells.width, Consts.block_size)
+            self.stale.append(pg.Rect(self.interior.x, self.interior.y + j * Consts.block_size, self.interior.width,
+                                      Consts.block_size))
+        self.cells.blit_sprites(Sprites.blocks, [(cell, i * Consts.block_size, j * Consts.block_size)
+                                                 for j, row in rows.items() for i, cell in enumerate(row) if cell is not None])
+
+    def restore(self) -> None:
+        """ Copies the stale regions of the interior back from the cells layer. """
+        for rect in self.stale:
+            rect = rect.clip(self.interior)
+            if not rect.width or not rect.height:
+                continue
+
+            self.fill(Colors.transparent, *rect)
+            blit_unblended(self.image, [(self.cells.image, rect, rect.move(-self.interior.x, -self.interior.y))])
+        self.stale.clear()
 
     def draw_tetromino(self, name: str, x: float, y: float, rotation: Iterable[Tuple[int, int]]) -> None:
-        for i, j in rotation:
-            self.blit(Images[name], x + (i + 1) * Consts.block_size, y + (j + 1) * Consts.block_size + self.offset)
+        super().draw_tetromino(name, x, y, rotation)
+        cells = [pg.Rect(x + (i + 1) * Consts.block_size, y + (j + 1) * Consts.block_size + self.offset,
+                         Consts.block_size, Consts.block_size) for i, j in rotation]
+        if cells:
+            self.stale.append(cells[0].unionall(cells[1:]))
 
 
 class Stats(Widget):
@@ -68,11 +105,15 @@ class Game(Screen):
     def __init__(self) -> None:
         super().__init__(Consts.game_screen_width, Consts.game_screen_height, fps=100)
         self.block_size = self.height * 0.8 // (Consts.board_height + 2)
+        self.fill(Colors.black)
+        # a mirror of the game's to_json, kept up to date by diffs
+        self.info = {}
+        self.version = 0
 
-    def blit_board(self, info: Dict) -> None:
-        self.board.reset()
-
-        self.board.draw_cells(info['board']['cells'])
+    def draw_board(self, info: Dict, rows: Dict[int, List[Optional[str]]]) -> None:
+        """ Redraws the changed rows of the locked cells, and the tetrominoes over them. """
+        self.board.draw_rows(rows)
+        self.board.restore()
 
         ghost_tetromino = info['ghost_tetromino']
         self.board.draw_tetromino('ghost', ghost_tetromino['x'] * Consts.block_size, ghost_tetromino['y'] * Consts.block_size,
@@ -80,38 +121,37 @@ class Game(Screen):
         current_tetromino = info['current_tetromino']
         self.board.draw_tetromino(current_tetromino['name'], current_tetromino['x'] * Consts.block_size,
                                   current_tetromino['y'] * Consts.block_size, current_tetromino['visible_rotation'])
-        self.blit_widget(self.board)
 
-    def blit_next(self, info: Dict) -> None:
+    def draw_next(self, info: Dict) -> None:
         self.next.reset()
         for i, tetromino in enumerate(info['tetromino_queue'][:Consts.next_size]):
             self.next.draw_tetromino(tetromino['name'], (self.next.width - (tetromino['width'] + 2) * Consts.block_size) * .5,
                                      (i * 3 + 1) * Consts.block_size, tetromino['rotation'])
-        self.blit_widget(self.next)
 
-    def blit_held(self, info: Dict) -> None:
+    def draw_held(self, info: Dict) -> None:
         self.held.reset()
         tetromino = info['held_tetromino']
         if tetromino is not None:
             self.held.draw_tetromino(tetromino['name'], (self.held.width - (tetromino['width'] + 2) * Consts.block_size) * .5,
                                      Consts.block_size, tetromino['rotation'])
-        self.blit_widget(self.held)
-
-    def blit_stats(self, info: Dict) -> None:
-        self.stats.update(info)
-        self.blit_widget(self.stats)
 
     def update(self) -> None:
-        self.fill(Colors.black)
-
-        info = self.tetris.to_json()
-        self.blit_board(info)
-        self.blit_next(info)
-        self.blit_held(info)
-        self.blit_stats(info)
-        self.blit_widget(self.reset_button)
-        self.blit_widget(self.ai_switch)
-        self.blit_widget(self.back)
+        diff = self.tetris.diff(self.version)
+        self.version = diff['version']
+        info = Tetris.apply_diff(self.info, diff)
+        # the widgets keep their drawings, and are only redrawn when their part of the game changed
+        if 'board' in diff or 'current_tetromino' in diff or 'ghost_tetromino' in diff:
+            self.draw_board(info, diff['board']['rows'] if 'board' in diff else {})
+        if 'tetromino_queue' in diff:
+            self.draw_next(info)
+        if 'held_tetromino' in diff:
+            self.draw_held(info)
+        if 'stats' in diff:
+            self.stats.update(info)
+
+        # only the regions of the widgets that were redrawn are repainted
+        for widget in (self.board, self.next, self.held, self.stats, self.reset_button, self.ai_switch, self.back):
+            self.blit_changes(widget, Colors.black)
 
         self.tetris.update()
 
@@ -155,13 +195,13 @@ class Game(Screen):
             self.tetris.stop_rotate_left()
 
     @cached_property
-    def board(self) -> Border:
-        return Border(x=self.width * .5,
-                      y=self.height * .5,
-                      width=Consts.board_width + 2,
-                      height=Consts.board_height + 2,
-                      title=Fonts.pixel.render('TETRIS', Colors.white, 2.125 * Consts.block_size),
-                      centered=True)
+    def board(self) -> Board:
+        return Board(x=self.width * .5,
+                     y=self.height * .5,
+                     width=Consts.board_width + 2,
+                     height=Consts.board_height + 2,
+                     title=Fonts.pixel.render('TETRIS', Colors.white, 2.125 * Consts.block_size),
+                     centered=True)
 
     @cached_property
     def held(self) -> Border:
@@ -210,4 +250,6 @@ class Game(Screen):
     def tetris(self) -> TetrisController:
         return TetrisController(width=Consts.board_width,
                                 height=Consts.board_height,
-                                high_score_filepath=os.path.join(Consts.base_path, 'high_score.txt'))
+                                high_score_filepath=os.path.join(Consts.base_path, 'high_score.txt'),
+                                depth=2,
+                                time_budget=.5 / self.fps)
@@ -26,12 +26,12 @@ and you get awarded some points."""
 class Instructions(Screen):
     def __init__(self) -> None:
         super().__init__(800, 800, fps=5)
+        self.fill(Colors.black)
 
     def update(self) -> None:
-        self.fill(Colors.black)
-        self.blit_widget(self.title)
-        self.blit_widget(self.instructions)
-        self.blit_widget(self.back)
+        self.blit_changes(self.title, Colors.black)
+        self.blit_changes(self.instructions, Colors.black)
+        self.blit_changes(self.back, Colors.black)
 
     def mouse_down(self, x: float, y: float) -> None:
         if self.back.overlap(x, y):
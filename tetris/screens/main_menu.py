@@ -10,10 +10,10 @@ class MainMenu(Screen):
         super().__init__(600, 600)
 
     def update(self) -> None:
-        self.blit_widget(self.title)
-        self.blit_widget(self.start_button)
-        self.blit_widget(self.instructions_button)
-        self.blit_widget(self.controls_button)
+        self.blit_changes(self.title)
+        self.blit_changes(self.start_button)
+        self.blit_changes(self.instructions_button)
+        self.blit_changes(self.controls_button)
 
     def mouse_down(self, x: float, y: float) -> None:
         if self.start_button.overlap(x, y):